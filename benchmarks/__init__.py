@@ -0,0 +1 @@
+"""SciKit Sequitur Benchmarks"""
@@ -0,0 +1,5 @@
+"""Run the benchmark suite, see `benchmarks.suite`."""
+
+from .suite import main
+
+main()
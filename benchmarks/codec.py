@@ -0,0 +1,66 @@
+"""Compression ratio and throughput of the grammar codec, zlib and lzma.
+
+Reproduces the README codec table:
+
+    $ python -m benchmarks.codec
+"""
+
+import io
+import lzma
+import pathlib
+import time
+import zlib
+
+from sksequitur import codec
+
+root_dir = pathlib.Path(__file__).parent.parent
+
+
+def sksequitur_compress(data):
+    """Compress UTF-8 bytes as a sequence of characters."""
+    buffer = io.BytesIO()
+    codec.compress(data.decode('utf-8'), buffer)
+    return buffer.getvalue()
+
+
+def sksequitur_decompress(data):
+    """Decompress to UTF-8 bytes."""
+    return ''.join(codec.decompress(io.BytesIO(data))).encode('utf-8')
+
+
+CODECS = {
+    'sksequitur': (sksequitur_compress, sksequitur_decompress),
+    'zlib': (lambda data: zlib.compress(data, 9), zlib.decompress),
+    'lzma': (lzma.compress, lzma.decompress),
+}
+
+
+def best(func, *args, repeat=5):
+    """Return result of func and the best seconds of repeat calls."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        times.append(time.perf_counter() - start)
+    return result, min(times)
+
+
+def main():
+    """Print a table of results."""
+    path = root_dir / 'tests' / 'genesis_input.txt'
+    data = path.read_bytes()
+    megabytes = len(data) / 1e6
+    for name, (compress, decompress) in CODECS.items():
+        compressed, compress_time = best(compress, data)
+        restored, decompress_time = best(decompress, compressed)
+        assert restored == data
+        ratio = len(data) / len(compressed)
+        print(
+            f'{name:10}  {len(compressed):6}  {ratio:5.2f}  '
+            f'{megabytes / compress_time:8.2f}  '
+            f'{megabytes / decompress_time:8.2f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Memory and throughput of the Parser, ArrayParser and FastParser engines.
+
+Reproduces the README benchmarks table:
+
+    $ python -m benchmarks.engines
+"""
+
+import gc
+import pathlib
+import random
+import string
+import time
+import tracemalloc
+
+from sksequitur import ArrayParser, Parser
+
+try:
+    from sksequitur._fast import FastParser
+except ImportError:  # pragma: no cover
+    ENGINES = (Parser, ArrayParser)
+else:
+    ENGINES = (Parser, ArrayParser, FastParser)
+
+root_dir = pathlib.Path(__file__).parent.parent
+
+
+def inputs():
+    """Return benchmark inputs by name."""
+    rand = random.Random(0)
+    genesis = root_dir / 'tests' / 'genesis_input.txt'
+    return {
+        'random': rand.choices(string.ascii_lowercase, k=200_000),
+        'genesis': list(genesis.read_text(encoding='utf-8')) * 40,
+    }
+
+
+def measure(engine, iterable):
+    """Return resident bytes per token and tokens per second.
+
+    C allocations are invisible to tracemalloc and are added from `nbytes`
+    where the engine reports them.
+
+    """
+    gc.collect()
+    tracemalloc.start()
+    parser = engine()
+    parser.feed(iterable)
+    resident, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    resident += getattr(parser, 'nbytes', 0)
+    del parser
+    gc.collect()
+    start = time.perf_counter()
+    parser = engine()
+    parser.feed(iterable)
+    elapsed = time.perf_counter() - start
+    return resident / len(iterable), len(iterable) / elapsed
+
+
+def main():
+    """Print a table of results."""
+    for name, iterable in inputs().items():
+        for engine in ENGINES:
+            per_token, rate = measure(engine, iterable)
+            print(
+                f'{name:12}  {engine.__name__:11}  {per_token:15.1f}  '
+                f'{rate:12,.0f}'
+            )
+
+
+if __name__ == '__main__':
+    main()
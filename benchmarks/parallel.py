@@ -0,0 +1,63 @@
+"""Scaling of parallel chunked parsing with the number of worker processes.
+
+Compares `parse_many` against a single `Parser.feed` call on the same input:
+
+    $ python -m benchmarks.parallel
+"""
+
+import os
+import pathlib
+import time
+
+from sksequitur import Mark, parse, parse_many
+from sksequitur.parallel import split
+
+root_dir = pathlib.Path(__file__).parent.parent
+
+
+def corpus(copies=64):
+    """Return genesis lines separated by marks, repeated copies times."""
+    genesis = root_dir / 'tests' / 'genesis_input.txt'
+    text = genesis.read_text(encoding='utf-8')
+    iterable = []
+    for _ in range(copies):
+        for line in text.splitlines(keepends=True):
+            iterable.extend(line)
+            iterable.append(Mark())
+    return iterable
+
+
+def timed(func, *args, **kwargs):
+    """Return result of func and seconds elapsed calling it."""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def check(grammar, iterable):
+    """Assert grammar expands to iterable. Marks are rebuilt from the
+    binary format and compare by identity, so values compare as text.
+
+    """
+    expansion = list(map(str, grammar.expand(0)))
+    assert expansion == list(map(str, iterable)), 'merged grammar differs'
+
+
+def main():
+    """Print a table of results."""
+    iterable = corpus()
+    _, baseline = timed(parse, iterable)
+    print(f'{"parse":16}  {baseline:8.2f}s')
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        chunks = list(split(iterable, len(iterable) // workers // 4))
+        grammar, elapsed = timed(parse_many, chunks, max_workers=workers)
+        check(grammar, iterable)
+        speedup = baseline / elapsed
+        name = f'parse_many({workers})'
+        print(f'{name:16}  {elapsed:8.2f}s  {speedup:5.2f}x')
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
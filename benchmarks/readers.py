@@ -0,0 +1,94 @@
+"""Peak memory of parsing a log file read whole and through `parse_file`.
+
+Writes a synthetic log of the given size in MB, default 64, and parses its
+lines in a fresh interpreter per method, reporting the peak resident set size:
+
+    $ python -m benchmarks.readers 1024
+"""
+
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from sksequitur import parse, parse_file
+
+TEMPLATES = [
+    'INFO request id={} path=/api/items status=200',
+    'INFO request id={} path=/api/users status=200',
+    'WARN slow query table=items ms={}',
+    'ERROR upstream timeout host=db{}',
+    'DEBUG cache hit key=items:{}',
+]
+
+
+def write_log(file, megabytes):
+    """Write megabytes of log lines with a few thousand distinct lines."""
+    rand = random.Random(0)
+    lines = [
+        template.format(rand.randrange(1000)) + '\n'
+        for template in TEMPLATES * 1000
+    ]
+    size = megabytes << 20
+    written = 0
+    while written < size:
+        chunk = ''.join(rand.choices(lines, k=10_000)).encode('utf-8')
+        file.write(chunk)
+        written += len(chunk)
+
+
+def read_whole(path):
+    """The usual pattern: read the file and split it into lines."""
+    with open(path, encoding='utf-8') as file:
+        return parse(file.read().splitlines())
+
+
+def read_lines(path):
+    """Read the list of lines with `readlines`."""
+    with open(path, encoding='utf-8') as file:
+        return parse(file.readlines())
+
+
+def read_mapped(path):
+    """Read interned lines through `parse_file`."""
+    return parse_file(path, encoding='utf-8')
+
+
+METHODS = {
+    'read().splitlines()': read_whole,
+    'readlines()': read_lines,
+    'parse_file': read_mapped,
+}
+
+
+def child(name, path):
+    """Parse path with method name and print seconds and peak MB."""
+    start = time.perf_counter()
+    METHODS[name](path)
+    elapsed = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f'{elapsed:.1f} {peak:.0f}')
+
+
+def main(megabytes=64):
+    """Print a table of results."""
+    with tempfile.NamedTemporaryFile(suffix='.log') as file:
+        write_log(file, megabytes)
+        file.flush()
+        for name in METHODS:
+            command = [sys.executable, '-m', __spec__.name, '--child', name]
+            command.append(file.name)
+            result = subprocess.run(
+                command, capture_output=True, check=True, text=True
+            )
+            elapsed, peak = result.stdout.split()
+            print(f'{name:20}  {megabytes:6} MB  {peak:>8} MB  {elapsed:>7} s')
+
+
+if __name__ == '__main__':
+    if sys.argv[1:2] == ['--child']:
+        child(*sys.argv[2:])
+    else:
+        main(*map(int, sys.argv[1:]))
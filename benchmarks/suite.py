@@ -0,0 +1,166 @@
+"""Throughput, memory and scaling curves for Parser and Grammar.
+
+Every case runs in a fresh interpreter so peak RSS is not shared between
+cases. The "python" backend blocks the compiled `sksequitur._core` extension
+before importing the package; the "compiled" backend requires it. Results
+are written as JSON so runs on different commits can be compared:
+
+    $ python -m benchmarks --output before.json
+    $ git checkout other-branch
+    $ python -m benchmarks --compare before.json
+"""
+
+import argparse
+import json
+import pathlib
+import platform
+import random
+import resource
+import string
+import subprocess
+import sys
+import time
+
+root_dir = pathlib.Path(__file__).parent.parent
+
+BACKENDS = ('python', 'compiled')
+INPUTS = ('random', 'genesis', 'repetitive')
+SIZES = (10_000, 100_000, 1_000_000)
+METRICS = ('feed', 'grammar', 'lengths', 'expansions', 'str')
+
+
+def make_input(name, size):
+    """Return input of size tokens, from highest to lowest entropy."""
+    if name == 'random':
+        rand = random.Random(0)
+        return rand.choices(string.ascii_lowercase, k=size)
+    if name == 'genesis':
+        genesis = root_dir / 'tests' / 'genesis_input.txt'
+        text = genesis.read_text(encoding='utf-8')
+        return list(text * (size // len(text) + 1))[:size]
+    if name == 'repetitive':
+        return list('abcdefgh' * (size // 8 + 1))[:size]
+    raise ValueError(f'unknown input {name!r}')
+
+
+def peak_rss():
+    """Peak resident set size of this process in bytes."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def timed(func, *args):
+    """Return result of calling func and seconds elapsed."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def run_case(backend, name, size):
+    """Measure one case in this process and return a result dictionary."""
+    if backend == 'python':
+        sys.modules['sksequitur._core'] = None  # type: ignore
+    # pylint: disable=import-outside-toplevel
+    from sksequitur import Grammar, Parser
+
+    compiled = Parser.__module__ == 'sksequitur._core'
+    if compiled != (backend == 'compiled'):
+        raise RuntimeError(f'{backend} backend is not available')
+    iterable = make_input(name, size)
+    baseline = peak_rss()
+    parser = Parser()
+    _, feed = timed(parser.feed, iterable)
+    rss = peak_rss()
+    grammar, grammar_time = timed(Grammar, parser.tree)
+    _, lengths = timed(grammar.lengths)
+    _, expansions = timed(grammar.expansions)
+    _, str_time = timed(str, grammar)
+    return {
+        'backend': backend,
+        'input': name,
+        'size': size,
+        'productions': len(grammar),
+        'tokens_per_sec': size / feed,
+        'baseline_rss': baseline,
+        'peak_rss': rss,
+        'seconds': {
+            'feed': feed,
+            'grammar': grammar_time,
+            'lengths': lengths,
+            'expansions': expansions,
+            'str': str_time,
+        },
+    }
+
+
+def spawn(backend, name, size):
+    """Run one case in a child interpreter and return its result."""
+    args = [sys.executable, '-m', 'benchmarks.suite', backend, name, str(size)]
+    process = subprocess.run(
+        args, capture_output=True, check=False, cwd=root_dir, text=True
+    )
+    if process.returncode:
+        lines = process.stderr.strip().splitlines() or ['failed']
+        return {
+            'backend': backend,
+            'input': name,
+            'size': size,
+            'error': lines[-1],
+        }
+    return json.loads(process.stdout)
+
+
+def compare(before, after):
+    """Print ratios of after to before seconds for matching cases."""
+    previous = {
+        (each['backend'], each['input'], each['size']): each
+        for each in before['results']
+        if 'error' not in each
+    }
+    for result in after['results']:
+        key = result['backend'], result['input'], result['size']
+        if 'error' in result or key not in previous:
+            continue
+        old = previous[key]['seconds']
+        new = result['seconds']
+        ratios = '  '.join(
+            f'{metric} {new[metric] / max(old[metric], 1e-9):5.2f}x'
+            for metric in METRICS
+        )
+        print(f'{key[0]:8}  {key[1]:10}  {key[2]:>9,}  {ratios}')
+
+
+def main(argv=None):
+    """Run benchmark cases and write JSON results."""
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    parser.add_argument('--backend', action='append', choices=BACKENDS)
+    parser.add_argument('--input', action='append', choices=INPUTS)
+    parser.add_argument('--size', action='append', type=int)
+    parser.add_argument('--output', type=argparse.FileType('w'))
+    parser.add_argument('--compare', type=argparse.FileType('r'))
+    args = parser.parse_args(argv)
+    results = [
+        spawn(backend, name, size)
+        for backend in args.backend or BACKENDS
+        for name in args.input or INPUTS
+        for size in args.size or SIZES
+    ]
+    report = {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'machine': platform.machine(),
+        'system': platform.system(),
+        'results': results,
+    }
+    if args.compare:
+        compare(json.load(args.compare), report)
+    if args.output:
+        json.dump(report, args.output, indent=2)
+    elif not args.compare:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == '__main__':
+    # Child interpreter started by spawn: run one case.
+    json.dump(run_case(sys.argv[1], sys.argv[2], int(sys.argv[3])), sys.stdout)
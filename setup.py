@@ -43,6 +43,8 @@ args = dict(
     url='http://www.grantjenks.com/docs/scikit-sequitur/',
     license='Apache 2.0',
     packages=['sksequitur'],
+    python_requires='>=3.7',
+    entry_points={'console_scripts': ['sksequitur=sksequitur.cli:main']},
     tests_require=['tox'],
     cmdclass={'test': Tox},
     classifiers=[
@@ -52,7 +54,6 @@ args = dict(
         'Natural Language :: English',
         'Programming Language :: Python',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.6',
         'Programming Language :: Python :: 3.7',
         'Programming Language :: Python :: 3.8',
         'Programming Language :: Python :: 3.9',
@@ -64,7 +65,10 @@ args = dict(
 try:
     from Cython.Build import cythonize
 
-    ext_modules = [Extension('sksequitur._core', ['sksequitur/core.py'])]
+    ext_modules = [
+        Extension('sksequitur._core', ['sksequitur/core.py']),
+        Extension('sksequitur._fast', ['sksequitur/_fast.pyx']),
+    ]
     setup(
         ext_modules=cythonize(ext_modules, language_level='3'),
         **args,
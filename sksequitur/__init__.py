@@ -11,11 +11,52 @@ The algorithm was developed by:
     Ian Witten, University of Waikato, New Zealand
 
 More details are available online at http://www.sequitur.info/
+
+Submodules are imported on first attribute access so importing the package is
+cheap. `backend` is "cython" when the compiled core is loaded and "python"
+otherwise. Set the environment variable SKSEQUITUR_REQUIRE_CYTHON=1 to raise
+ImportError instead of falling back to the pure-Python core.
 """
 
-from .api import Grammar, Mark, Production, parse
-from .core import Parser
+import importlib
+
+_modules = {
+    'ArrayParser': 'arrays',
+    'AsyncParser': 'aio',
+    'Checkpoint': 'stream',
+    'Grammar': 'api',
+    'GrammarView': 'api',
+    'MappedGrammar': 'binary',
+    'Mark': 'api',
+    'Parser': 'core',
+    'Production': 'api',
+    'Profile': 'profiling',
+    'Stats': 'core',
+    'StreamParser': 'stream',
+    'SymbolTable': 'core',
+    'backend': 'core',
+    'parse': 'api',
+    'parse_file': 'readers',
+    'parse_many': 'parallel',
+    'read_tokens': 'readers',
+}
+
+__all__ = sorted(_modules)
+
+
+def __getattr__(name):
+    """Import the submodule defining name on first access."""
+    module_name = _modules.get(name)
+    if module_name is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    module = importlib.import_module(f'.{module_name}', __name__)
+    value = globals()[name] = getattr(module, name)
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
 
-__all__ = ['Grammar', 'Mark', 'Parser', 'Production', 'parse']
 __title__ = 'sksequitur'
 __version__ = '0.4.0'
@@ -0,0 +1,5 @@
+"""SciKit Sequitur Command Line, see `sksequitur.cli`."""
+
+from .cli import main
+
+main()
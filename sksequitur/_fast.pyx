@@ -0,0 +1,519 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""SciKit Sequitur Fast
+
+Hand-written compiled engine. Nodes are C structs in one pooled arena with a
+free list, values are interned integer ids and bigrams live in an
+open-addressing hash table keyed by the packed pair of ids. Once a value is
+interned, parsing it touches no Python objects. The algorithm mirrors
+`sksequitur.core` step for step so both engines produce identical grammars.
+
+Build with the other extensions:
+
+    $ python setup.py build_ext --inplace
+"""
+
+from libc.stdint cimport (int8_t, int16_t, int32_t, int64_t, uint8_t, uint16_t,
+                          uint32_t, uint64_t)
+from libc.stdlib cimport free, malloc, realloc
+from libc.string cimport memcpy
+
+from .core import Rule, as_ints
+
+
+# Values: terminal ids are non-negative, `GUARD` marks the guard node of a
+# rule and `-2 - g` references the rule guarded by node `g`.
+cdef enum:
+    NIL = -1
+    GUARD = -1
+    EMPTY = 0
+    DIRECT = 1 << 16
+    MAX_NODES = 0x7FFFFFF0
+
+
+cdef struct Node:
+    int32_t next
+    int32_t prev
+    int32_t value
+    int32_t count  # Reference count, guards only.
+
+
+cdef struct Entry:
+    uint64_t key
+    int32_t node
+
+
+cdef inline uint64_t _pack(int32_t left, int32_t right):
+    """Bigram key of two values biased by 2**31, as in `ArrayParser`.
+
+    Never `EMPTY`: node indexes stay below `MAX_NODES` so values are greater
+    than -2**31.
+
+    """
+    cdef uint32_t bias = 0x80000000
+    return (<uint64_t>(<uint32_t>left ^ bias) << 32) | (
+        <uint32_t>right ^ bias
+    )
+
+
+cdef class FastParser:
+    """Parser for Sequitur parse trees in C structs.
+
+    Terminal values are interned to ids by equality, as `Parser` compares
+    them in bigrams, so equal values like 1 and 1.0 share the id of the first
+    one seen. Integers from 0 to 65535 fed with `feed_array` are read from
+    the buffer and looked up without creating Python objects.
+
+    """
+
+    cdef Node *_nodes
+    cdef int32_t _size
+    cdef int32_t _capacity
+    cdef int32_t _free
+    cdef Entry *_table
+    cdef uint64_t _mask
+    cdef int _shift
+    cdef int64_t _used
+    cdef int32_t *_direct
+    cdef int32_t _root
+    cdef dict _ids
+    cdef list _terminals
+
+    def __cinit__(self):
+        self._nodes = NULL
+        self._table = NULL
+        self._direct = NULL
+        self._size = 0
+        self._capacity = 0
+        self._free = NIL
+        self._used = 0
+
+    def __init__(self):
+        cdef int32_t index
+        self._ids = {}
+        self._terminals = []
+        self._direct = <int32_t *>malloc(DIRECT * sizeof(int32_t))
+        if self._direct == NULL:
+            raise MemoryError()
+        for index in range(DIRECT):
+            self._direct[index] = NIL
+        self._resize(1024)
+        self._root = self._new_rule()
+
+    def __dealloc__(self):
+        free(self._nodes)
+        free(self._table)
+        free(self._direct)
+
+    @property
+    def tree(self):
+        """Root of the parse tree.
+
+        The nodes are materialized as linked `Symbol` and `Rule` objects so
+        that `Grammar` works unchanged. Each access builds a new snapshot.
+
+        """
+        cdef int32_t guard, node, value
+        scratch = {}
+        rules = {}
+        pending = [self._root]
+        terminals = self._terminals
+        tree = rules[self._root] = Rule()
+        while pending:
+            guard = pending.pop()
+            rule = rules[guard]
+            node = self._nodes[guard].next
+            while node != guard:
+                value = self._nodes[node].value
+                if value < GUARD:
+                    child = rules.get(-2 - value)
+                    if child is None:
+                        child = rules[-2 - value] = Rule()
+                        pending.append(-2 - value)
+                    rule.prev_symbol.append(child, scratch)
+                else:
+                    rule.prev_symbol.append(terminals[value], scratch)
+                node = self._nodes[node].next
+        return tree
+
+    @property
+    def bigrams(self):
+        """Parser bigrams keyed by packed integer."""
+        cdef uint64_t index
+        bigrams = {}
+        for index in range(self._mask + 1):
+            if self._table[index].key != EMPTY:
+                bigrams[self._table[index].key] = self._table[index].node
+        return bigrams
+
+    @property
+    def nbytes(self):
+        """Bytes allocated for nodes, bigrams and the direct id cache."""
+        return (
+            self._capacity * sizeof(Node)
+            + (self._mask + 1) * sizeof(Entry)
+            + DIRECT * sizeof(int32_t)
+        )
+
+    @property
+    def terminals(self):
+        """Terminal values indexed by interned id."""
+        return self._terminals
+
+    def feed(self, iterable):
+        """Feed iterable to the parser.
+
+        Iterate items in iterable, intern them, and build the parse tree.
+
+        """
+        cdef int32_t ident
+        cdef int32_t root = self._root
+        ids = self._ids
+        for value in iterable:
+            ident = ids.get(value, NIL)
+            if ident == NIL:
+                ident = self._intern(value)
+            self._append(self._nodes[root].prev, ident)
+            self._check(self._nodes[self._nodes[root].prev].prev)
+
+    def feed_array(self, buffer):
+        """Feed a contiguous buffer of integers to the parser."""
+        ints = as_ints(buffer)
+        cdef const unsigned char[:] data = ints.cast('B')
+        cdef Py_ssize_t itemsize = ints.itemsize
+        cdef bint signed = ints.format in 'bhilqn'
+        cdef Py_ssize_t index
+        cdef int64_t number
+        cdef int32_t ident
+        cdef int32_t root = self._root
+        for index in range(0, data.shape[0], itemsize):
+            number = _read(&data[index], itemsize, signed)
+            if 0 <= number < DIRECT and self._direct[number] != NIL:
+                ident = self._direct[number]
+            elif signed or number >= 0:
+                ident = self._intern_int(number)
+            else:
+                ident = self._intern_int(<uint64_t>number)
+            self._append(self._nodes[root].prev, ident)
+            self._check(self._nodes[self._nodes[root].prev].prev)
+
+    cdef int32_t _intern_int(self, value) except -2:
+        """Return the id of an integer read from a buffer and cache it."""
+        cdef int32_t ident = self._ids.get(value, NIL)
+        if ident == NIL:
+            ident = self._intern(value)
+        if 0 <= value < DIRECT:
+            self._direct[value] = ident
+        return ident
+
+    cdef int32_t _intern(self, value) except -2:
+        """Assign the next terminal id to value."""
+        cdef int32_t ident = len(self._terminals)
+        self._ids[value] = ident
+        self._terminals.append(value)
+        return ident
+
+    cdef int _resize(self, uint64_t capacity) except -1:
+        """Rehash the bigram table into capacity slots, a power of two."""
+        cdef Entry *old = self._table
+        cdef uint64_t old_size = 0 if old == NULL else self._mask + 1
+        cdef uint64_t index, slot
+        cdef Entry *table = <Entry *>malloc(capacity * sizeof(Entry))
+        if table == NULL:
+            raise MemoryError()
+        for index in range(capacity):
+            table[index].key = EMPTY
+        self._table = table
+        self._mask = capacity - 1
+        self._shift = 64
+        while capacity > 1:
+            capacity >>= 1
+            self._shift -= 1
+        for index in range(old_size):
+            if old[index].key != EMPTY:
+                slot = self._home(old[index].key)
+                while table[slot].key != EMPTY:
+                    slot = (slot + 1) & self._mask
+                table[slot] = old[index]
+        free(old)
+        return 0
+
+    cdef inline uint64_t _home(self, uint64_t key):
+        """Preferred slot of key by Fibonacci hashing."""
+        return (key * 0x9E3779B97F4A7C15ULL) >> self._shift
+
+    cdef int32_t _get(self, uint64_t key):
+        """Node of bigram key or `NIL`."""
+        cdef uint64_t slot = self._home(key)
+        cdef Entry *table = self._table
+        while table[slot].key != EMPTY:
+            if table[slot].key == key:
+                return table[slot].node
+            slot = (slot + 1) & self._mask
+        return NIL
+
+    cdef int _set(self, uint64_t key, int32_t node) except -1:
+        """Map bigram key to node."""
+        cdef uint64_t slot = self._home(key)
+        cdef Entry *table = self._table
+        while table[slot].key != EMPTY:
+            if table[slot].key == key:
+                table[slot].node = node
+                return 0
+            slot = (slot + 1) & self._mask
+        table[slot].key = key
+        table[slot].node = node
+        self._used += 1
+        if 2 * self._used > <int64_t>self._mask:
+            self._resize(2 * (self._mask + 1))
+        return 0
+
+    cdef void _discard(self, uint64_t key, int32_t node):
+        """Remove bigram key if it maps to node, shifting later entries of
+        the probe run back so lookups need no tombstones.
+
+        """
+        cdef uint64_t slot = self._home(key)
+        cdef uint64_t hole, home
+        cdef Entry *table = self._table
+        cdef uint64_t mask = self._mask
+        while table[slot].key != key:
+            if table[slot].key == EMPTY:
+                return
+            slot = (slot + 1) & mask
+        if table[slot].node != node:
+            return
+        hole = slot
+        while True:
+            slot = (slot + 1) & mask
+            if table[slot].key == EMPTY:
+                break
+            home = self._home(table[slot].key)
+            # Keep entries whose home lies cyclically in (hole, slot].
+            if (slot - home) & mask < (slot - hole) & mask:
+                continue
+            table[hole] = table[slot]
+            hole = slot
+        table[hole].key = EMPTY
+        self._used -= 1
+
+    cdef inline uint64_t _key(self, int32_t node):
+        """Bigram key of node value and next node value."""
+        cdef Node *nodes = self._nodes
+        return _pack(nodes[node].value, nodes[nodes[node].next].value)
+
+    cdef int32_t _alloc(self, int32_t value) except -2:
+        """Allocate a node for value, reusing freed nodes first."""
+        cdef int32_t node
+        cdef Node *nodes
+        if self._free != NIL:
+            node = self._free
+            self._free = self._nodes[node].next
+        else:
+            if self._size == self._capacity:
+                self._grow()
+            node = self._size
+            self._size += 1
+        nodes = self._nodes
+        nodes[node].next = NIL
+        nodes[node].prev = NIL
+        nodes[node].value = value
+        nodes[node].count = 0
+        if value < GUARD:
+            nodes[-2 - value].count += 1
+        return node
+
+    cdef int _grow(self) except -1:
+        """Double the capacity of the node arena."""
+        cdef int64_t capacity = max(2 * <int64_t>self._capacity, 1024)
+        capacity = min(capacity, MAX_NODES)
+        if capacity <= self._capacity:
+            raise MemoryError('too many parse tree nodes')
+        cdef Node *nodes = <Node *>realloc(self._nodes, capacity * sizeof(Node))
+        if nodes == NULL:
+            raise MemoryError()
+        self._nodes = nodes
+        self._capacity = <int32_t>capacity
+        return 0
+
+    cdef void _release(self, int32_t node):
+        """Return node to the free list."""
+        self._nodes[node].next = self._free
+        self._free = node
+
+    cdef int32_t _new_rule(self) except -2:
+        """Create an empty rule and return its guard node."""
+        cdef int32_t guard = self._alloc(GUARD)
+        self._nodes[guard].next = guard
+        self._nodes[guard].prev = guard
+        return guard
+
+    cdef int32_t _append(self, int32_t node, int32_t value) except -2:
+        """Insert a value after node and return the new node."""
+        cdef int32_t symbol = self._alloc(value)
+        self._join(symbol, self._nodes[node].next)
+        self._join(node, symbol)
+        return symbol
+
+    cdef int _join(self, int32_t left, int32_t right) except -1:
+        """Link two nodes together, removing any old bigram from the hash
+        table.
+
+        """
+        cdef Node *nodes = self._nodes
+        cdef int32_t after = nodes[left].next
+        cdef int32_t before, value
+        if after != NIL:
+            self._discard(_pack(nodes[left].value, nodes[after].value), left)
+
+            # See Symbol.join for the trigram bookkeeping. Only a freshly
+            # allocated right node may lack a neighbour and guards never
+            # form trigrams.
+
+            before = nodes[right].prev
+            if before != NIL:
+                value = nodes[right].value
+                if value != GUARD and value == nodes[before].value:
+                    if value == nodes[nodes[right].next].value:
+                        self._set(self._key(right), right)
+
+            before = nodes[left].prev
+            value = nodes[left].value
+            if value != GUARD and value == nodes[before].value:
+                if value == nodes[nodes[left].next].value:
+                    self._set(self._key(before), before)
+
+        nodes[left].next = right
+        nodes[right].prev = left
+        return 0
+
+    cdef int _check(self, int32_t node) except -1:
+        """Check a new bigram. If it appears elsewhere, deal with it by calling
+        _process_match(), otherwise insert it into the hash table. Return
+        whether it appeared.
+
+        """
+        cdef Node *nodes = self._nodes
+        cdef int32_t left = nodes[node].value
+        cdef int32_t right = nodes[nodes[node].next].value
+        if left == GUARD or right == GUARD:
+            return False
+        cdef uint64_t key = _pack(left, right)
+        cdef int32_t match = self._get(key)
+        if match == NIL:
+            self._set(key, node)
+            return False
+        if nodes[match].next != node:
+            self._process_match(node, match)
+        return True
+
+    cdef int _process_match(self, int32_t node, int32_t match) except -1:
+        """Process match by either reusing an existing rule or creating a new
+        rule.
+
+        Checks also for an underused rule.
+
+        """
+        cdef int32_t rule, first, value
+        cdef int32_t before = self._nodes[match].prev
+        # Start rules are never referenced so their count is zero.
+        if (
+            self._nodes[before].value == GUARD
+            and self._nodes[before].count
+            and self._nodes[
+                self._nodes[self._nodes[match].next].next
+            ].value == GUARD
+        ):
+            # Reuse an existing rule.
+            rule = before
+            self._substitute(node, rule)
+        else:
+            # Create a new rule.
+            rule = self._new_rule()
+            self._append(self._nodes[rule].prev, self._nodes[node].value)
+            self._append(
+                self._nodes[rule].prev,
+                self._nodes[self._nodes[node].next].value,
+            )
+            self._substitute(match, rule)
+            self._substitute(node, rule)
+            first = self._nodes[rule].next
+            self._set(self._key(first), first)
+        # Check for an underused rule.
+        first = self._nodes[rule].next
+        value = self._nodes[first].value
+        if value < GUARD and self._nodes[-2 - value].count == 1:
+            self._expand(first)
+        return 0
+
+    cdef int _substitute(self, int32_t node, int32_t rule) except -1:
+        """Substitute node and next with given rule."""
+        cdef int32_t prev = self._nodes[node].prev
+        self._delete(self._nodes[prev].next)
+        self._delete(self._nodes[prev].next)
+        self._append(prev, -2 - rule)
+        if not self._check(prev):
+            self._check(self._nodes[prev].next)
+        return 0
+
+    cdef int _delete(self, int32_t node) except -1:
+        """Unlink node, remove its bigram, decrement any rule reference count,
+        and release it to the free list.
+
+        """
+        self._join(self._nodes[node].prev, self._nodes[node].next)
+        self._discard(self._key(node), node)
+        cdef int32_t value = self._nodes[node].value
+        if value < GUARD:
+            self._nodes[-2 - value].count -= 1
+        self._release(node)
+        return 0
+
+    cdef int _expand(self, int32_t node) except -1:
+        """This node is the last reference to its rule. It is deleted, and the
+        contents of the rule substituted in its place.
+
+        """
+        cdef int32_t left = self._nodes[node].prev
+        cdef int32_t right = self._nodes[node].next
+        cdef int32_t rule = -2 - self._nodes[node].value
+        cdef int32_t first = self._nodes[rule].next
+        cdef int32_t last = self._nodes[rule].prev
+        self._discard(self._key(node), node)
+        self._join(left, first)
+        self._join(last, right)
+        self._set(self._key(last), last)
+        self._release(node)
+        self._release(rule)
+        return 0
+
+
+cdef inline int64_t _read(const unsigned char *data, Py_ssize_t size,
+                          bint signed):
+    """Native integer of size bytes at data."""
+    cdef int8_t i8
+    cdef int16_t i16
+    cdef int32_t i32
+    cdef int64_t i64
+    cdef uint8_t u8
+    cdef uint16_t u16
+    cdef uint32_t u32
+    if size == 1:
+        if signed:
+            memcpy(&i8, data, 1)
+            return i8
+        memcpy(&u8, data, 1)
+        return u8
+    if size == 2:
+        if signed:
+            memcpy(&i16, data, 2)
+            return i16
+        memcpy(&u16, data, 2)
+        return u16
+    if size == 4:
+        if signed:
+            memcpy(&i32, data, 4)
+            return i32
+        memcpy(&u32, data, 4)
+        return u32
+    memcpy(&i64, data, 8)
+    return i64
@@ -0,0 +1,168 @@
+"""SciKit Sequitur Async
+
+Feed a parser from asyncio producers without blocking the event loop:
+
+    async with AsyncParser() as parser:
+        await parser.feed(reader)
+        grammar = await parser.grammar()
+
+Chunks are parsed on a worker thread. The worker holds the GIL while parsing,
+so chunks are fed in batches: between batches the GIL is handed back and the
+event loop runs about every `sys.getswitchinterval()` seconds, even when the
+compiled parser parses a whole batch without releasing the GIL.
+"""
+
+import asyncio
+import threading
+from itertools import islice
+from queue import SimpleQueue
+
+from .api import Grammar
+from .core import Parser
+
+_STOP = object()
+
+
+class AsyncParser:
+    """Parse chunks from asyncio producers on a worker thread.
+
+    A chunk is an iterable of values fed to `parser` in calls to
+    `Parser.feed` of at most `batch` values, so bytes chunks are parsed as
+    integers. At most `maxsize` chunks wait to be parsed: `put` waits for a
+    free slot, which slows producers to the parsing rate and bounds memory.
+
+    The worker starts on the first `put` and stops on `close`, or on leaving
+    the `async with` block, once the queued chunks are parsed. Do not use
+    `parser` directly while the worker runs. An error while parsing is raised
+    by the next `grammar` or `close` and later chunks are dropped.
+
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, parser=None, maxsize=16, batch=4096):
+        if maxsize < 1:
+            raise ValueError('maxsize must be positive')
+        if batch < 1:
+            raise ValueError('batch must be positive')
+        self.parser = Parser() if parser is None else parser
+        self.maxsize = maxsize
+        self.batch = batch
+        self._queue = SimpleQueue()
+        self._loop = None
+        self._slots = None
+        self._thread = None
+        self._pending = 0
+        self._error = None
+
+    @property
+    def pending(self):
+        """Number of chunks put but not yet parsed."""
+        return self._pending
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def put(self, chunk):
+        """Queue chunk for parsing, waiting while `maxsize` chunks pend."""
+        self._start()
+        await self._slots.acquire()
+        self._pending += 1
+        self._queue.put((chunk, None))
+
+    async def feed(self, source, size=1 << 16):
+        """Put every chunk of source.
+
+        Source is an `asyncio.StreamReader`, read `size` bytes at a time, or
+        an async iterator of chunks.
+
+        """
+        if isinstance(source, asyncio.StreamReader):
+            while True:
+                chunk = await source.read(size)
+                if not chunk:
+                    break
+                await self.put(chunk)
+        else:
+            async for chunk in source:
+                await self.put(chunk)
+
+    async def grammar(self):
+        """Return a `Grammar` of every chunk put so far.
+
+        The grammar is built on the worker after the queued chunks are parsed.
+
+        """
+        self._start()
+        return await self._request(None)
+
+    async def close(self):
+        """Parse the queued chunks and stop the worker."""
+        if self._thread is None:
+            return
+        try:
+            await self._request(_STOP)
+        finally:
+            self._thread.join()
+            self._thread = None
+
+    def _start(self):
+        """Start the worker thread in the running event loop."""
+        if self._thread is None:
+            self._loop = asyncio.get_running_loop()
+            self._slots = asyncio.Semaphore(self.maxsize)
+            self._thread = threading.Thread(target=self._work, daemon=True)
+            self._thread.start()
+
+    def _request(self, kind):
+        """Return a future resolved by the worker after the queued chunks."""
+        future = self._loop.create_future()
+        self._queue.put((kind, future))
+        return future
+
+    def _parsed(self):
+        """Free the slot of a parsed chunk, in the event loop."""
+        self._pending -= 1
+        self._slots.release()
+
+    def _settle(self, future, result):
+        """Resolve future with result, or the parse error, in event loop."""
+        if future.done():
+            return
+        if self._error is None:
+            future.set_result(result)
+        else:
+            future.set_exception(self._error)
+
+    def _feed(self, chunk):
+        """Feed chunk to the parser in batches, recording any error."""
+        values = iter(chunk)
+        try:
+            while True:
+                part = list(islice(values, self.batch))
+                if not part:
+                    break
+                self.parser.feed(part)
+        except Exception as error:  # pylint: disable=broad-except
+            self._error = error
+
+    def _work(self):
+        """Parse queued chunks and answer requests in order."""
+        call = self._loop.call_soon_threadsafe
+        while True:
+            item, future = self._queue.get()
+            if future is None:
+                if self._error is None:
+                    self._feed(item)
+                call(self._parsed)
+                continue
+            if item is _STOP:
+                call(self._settle, future, None)
+                return
+            grammar = None
+            if self._error is None:
+                grammar = Grammar(self.parser.tree, self.parser.symbols)
+            call(self._settle, future, grammar)
@@ -0,0 +1,292 @@
+"""SciKit Sequitur Arrays
+
+Array-backed alternative to the linked-list `Symbol` and `Rule` engine.
+
+Terminal values are interned to integer ids and every node of the parse tree
+is an index into preallocated, growable integer arrays holding the next, prev
+and value fields. Bigrams are keyed by a packed 64-bit integer rather than a
+tuple. The algorithm mirrors `sksequitur.core` step for step so both engines
+produce identical grammars.
+"""
+
+from array import array
+from collections import deque
+
+from .core import Rule, as_ints
+
+NIL = -1
+GUARD = -1
+BIAS = 1 << 31
+TYPECODE = 'i'
+
+
+class ArrayParser:
+    """Parser for Sequitur parse trees backed by integer arrays.
+
+    Values are encoded as integers: terminals are non-negative interned ids,
+    rule guards are `GUARD` and references to the rule guarded by node `g`
+    are `-2 - g`. Deleted nodes are recycled through a free list.
+
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self):
+        self._next = array(TYPECODE)
+        self._prev = array(TYPECODE)
+        self._value = array(TYPECODE)
+        self._size = 0
+        self._free = []
+        self._counts = {}
+        self._bigrams = {}
+        self._ids = {}
+        self._terminals = []
+        self._root = self._new_rule()
+
+    @property
+    def tree(self):
+        """Root of the parse tree.
+
+        The arrays are materialized as linked `Symbol` and `Rule` objects so
+        that `Grammar` works unchanged. Each access builds a new snapshot.
+
+        """
+        nodes = self._next
+        values = self._value
+        terminals = self._terminals
+        scratch = {}
+        rules = {}
+
+        def _rule(guard):
+            rule = rules.get(guard)
+            if rule is None:
+                rule = rules[guard] = Rule()
+                pending.append(guard)
+            return rule
+
+        pending = deque()
+        tree = _rule(self._root)
+        while pending:
+            guard = pending.popleft()
+            rule = rules[guard]
+            node = nodes[guard]
+            while node != guard:
+                value = values[node]
+                if value < GUARD:
+                    rule.prev_symbol.append(_rule(-2 - value), scratch)
+                else:
+                    rule.prev_symbol.append(terminals[value], scratch)
+                node = nodes[node]
+        return tree
+
+    @property
+    def bigrams(self):
+        """Parser bigrams keyed by packed integer."""
+        return self._bigrams
+
+    @property
+    def terminals(self):
+        """Terminal values indexed by interned id."""
+        return self._terminals
+
+    def feed(self, iterable):
+        """Feed iterable to the parser.
+
+        Iterate items in iterable, intern them, and build the parse tree.
+
+        """
+        ids = self._ids
+        prevs = self._prev
+        root = self._root
+        for value in iterable:
+            ident = ids.get(value)
+            if ident is None:
+                ident = self._intern(value)
+            self._append(prevs[root], ident)
+            self._check(prevs[prevs[root]])
+
+    def feed_array(self, buffer):
+        """Feed a contiguous buffer of integers to the parser."""
+        self.feed(as_ints(buffer))
+
+    def _intern(self, value):
+        """Assign the next terminal id to value."""
+        ident = self._ids[value] = len(self._terminals)
+        self._terminals.append(value)
+        return ident
+
+    def _alloc(self, value):
+        """Allocate a node for value, reusing freed nodes first."""
+        if self._free:
+            node = self._free.pop()
+        else:
+            node = self._size
+            if node == len(self._value):
+                self._grow()
+            self._size = node + 1
+        self._next[node] = NIL
+        self._prev[node] = NIL
+        self._value[node] = value
+        if value < GUARD:
+            self._counts[-2 - value] += 1
+        return node
+
+    def _grow(self):
+        """Double the capacity of the node arrays."""
+        extra = array(TYPECODE, [NIL]) * max(len(self._value), 1024)
+        self._next.extend(extra)
+        self._prev.extend(extra)
+        self._value.extend(extra)
+
+    def _new_rule(self):
+        """Create an empty rule and return its guard node."""
+        guard = self._alloc(GUARD)
+        self._next[guard] = guard
+        self._prev[guard] = guard
+        self._counts[guard] = 0
+        return guard
+
+    def _key(self, node):
+        """Bigram key packing node value and next node value."""
+        values = self._value
+        left = values[node] + BIAS
+        right = values[self._next[node]] + BIAS
+        return left << 32 | right
+
+    def _append(self, node, value):
+        """Insert a value after node and return the new node."""
+        symbol = self._alloc(value)
+        self._join(symbol, self._next[node])
+        self._join(node, symbol)
+        return symbol
+
+    def _join(self, left, right):
+        """Link two nodes together, removing any old bigram from the hash
+        table.
+
+        """
+        nexts = self._next
+        prevs = self._prev
+        after = nexts[left]
+        if after != NIL:
+            values = self._value
+            bigrams = self._bigrams
+            key = (values[left] + BIAS) << 32 | (values[after] + BIAS)
+            if bigrams.get(key) == left:
+                del bigrams[key]
+
+            # See Symbol.join for the trigram bookkeeping. Only a freshly
+            # allocated right node may lack a neighbour and guards never
+            # form trigrams.
+
+            before = prevs[right]
+            if before != NIL:
+                value = values[right]
+                if value != GUARD and value == values[before]:
+                    if value == values[nexts[right]]:
+                        bigrams[self._key(right)] = right
+
+            before = prevs[left]
+            value = values[left]
+            if value != GUARD and value == values[before]:
+                if value == values[nexts[left]]:
+                    bigrams[self._key(before)] = before
+
+        nexts[left] = right
+        prevs[right] = left
+
+    def _remove_bigram(self, node):
+        """Remove the bigram from the hash table."""
+        key = self._key(node)
+        if self._bigrams.get(key) == node:
+            del self._bigrams[key]
+
+    def _check(self, node):
+        """Check a new bigram. If it appears elsewhere, deal with it by calling
+        _process_match(), otherwise insert it into the hash table.
+
+        """
+        values = self._value
+        after = self._next[node]
+        left = values[node]
+        right = values[after]
+        if GUARD in (left, right):
+            return False
+        key = (left + BIAS) << 32 | (right + BIAS)
+        match = self._bigrams.get(key)
+        if match is None:
+            self._bigrams[key] = node
+            return False
+        if self._next[match] != node:
+            self._process_match(node, match)
+        return True
+
+    def _process_match(self, node, match):
+        """Process match by either reusing an existing rule or creating a new
+        rule.
+
+        Checks also for an underused rule.
+
+        """
+        nexts = self._next
+        values = self._value
+        if (
+            values[self._prev[match]] == GUARD
+            and values[nexts[nexts[match]]] == GUARD
+        ):
+            # Reuse an existing rule.
+            rule = self._prev[match]
+            self._substitute(node, rule)
+        else:
+            # Create a new rule.
+            rule = self._new_rule()
+            self._append(self._prev[rule], values[node])
+            self._append(self._prev[rule], values[nexts[node]])
+            self._substitute(match, rule)
+            self._substitute(node, rule)
+            first = nexts[rule]
+            self._bigrams[self._key(first)] = first
+        # Check for an underused rule.
+        first = nexts[rule]
+        value = values[first]
+        if value < GUARD and self._counts[-2 - value] == 1:
+            self._expand(first)
+
+    def _substitute(self, node, rule):
+        """Substitute node and next with given rule."""
+        prev = self._prev[node]
+        self._delete(self._next[prev])
+        self._delete(self._next[prev])
+        self._append(prev, -2 - rule)
+        if not self._check(prev):
+            self._check(self._next[prev])
+
+    def _delete(self, node):
+        """Unlink node, remove its bigram, decrement any rule reference count,
+        and release it to the free list.
+
+        """
+        self._join(self._prev[node], self._next[node])
+        self._remove_bigram(node)
+        value = self._value[node]
+        if value < GUARD:
+            self._counts[-2 - value] -= 1
+        self._free.append(node)
+
+    def _expand(self, node):
+        """This node is the last reference to its rule. It is deleted, and the
+        contents of the rule substituted in its place.
+
+        """
+        left = self._prev[node]
+        right = self._next[node]
+        rule = -2 - self._value[node]
+        first = self._next[rule]
+        last = self._prev[rule]
+        self._remove_bigram(node)
+        self._join(left, first)
+        self._join(last, right)
+        self._bigrams[self._key(last)] = last
+        del self._counts[rule]
+        self._free.append(node)
+        self._free.append(rule)
@@ -0,0 +1,453 @@
+"""SciKit Sequitur Binary
+
+Compact, versioned binary format for grammars with memory-mapped loading.
+
+The file starts with a fixed header followed by four sections, each aligned to
+eight bytes and stored little-endian:
+
+1. Production offsets: ``productions + 1`` int64 offsets into the body array.
+2. Bodies: int64 codes. Non-negative codes index the terminal table and
+   negative codes ``~p`` reference production ``p``.
+3. Terminal offsets: ``terminals + 1`` int64 offsets into the terminal data.
+4. Terminal data: one tag byte per terminal followed by its payload.
+
+`dump_parser` saves the state of a `Parser` in the same layout with its own
+header, so a long-running parse can be resumed with `Parser.load`.
+"""
+
+import hashlib
+import io
+import mmap
+import pickle
+import struct
+import sys
+from array import array
+from collections import Counter
+from collections.abc import Mapping
+
+from .api import Production
+from .core import Rule
+
+MAGIC = b'SKSQ'
+VERSION = 1
+HEADER = struct.Struct('<4sHHQQQQ')
+
+_FLOAT = struct.Struct('<d')
+
+PARSER_MAGIC = b'SKSP'
+PARSER_VERSION = 1
+PARSER_HEADER = struct.Struct('<4sHHQQQQQQ')
+
+# Parser state flag: terminal codes are ids of the saved symbol table.
+INTERNED = 1
+
+
+def encode_terminal(value):
+    """Encode terminal value as tagged bytes."""
+    kind = type(value)
+    if kind is str:
+        return b's' + value.encode('utf-8')
+    if kind is bytes:
+        return b'b' + value
+    if kind is int:
+        size = value.bit_length() // 8 + 1
+        return b'i' + value.to_bytes(size, 'little', signed=True)
+    if kind is float:
+        return b'f' + _FLOAT.pack(value)
+    return b'p' + pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+
+def hash_terminal(value):
+    """Return 64-bit BLAKE2b hash of the encoding of terminal value."""
+    digest = hashlib.blake2b(encode_terminal(value), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def decode_terminal(data):
+    """Decode tagged bytes as terminal value."""
+    tag = data[:1]
+    payload = data[1:]
+    if tag == b's':
+        return str(payload, 'utf-8')
+    if tag == b'b':
+        return bytes(payload)
+    if tag == b'i':
+        return int.from_bytes(payload, 'little', signed=True)
+    if tag == b'f':
+        return _FLOAT.unpack(payload)[0]
+    if tag == b'p':
+        return pickle.loads(payload)
+    raise ValueError(f'unknown terminal tag {tag!r}')
+
+
+def _pad(size):
+    """Bytes of padding to align size to eight bytes."""
+    return -size % 8
+
+
+def _int64s(view):
+    """View bytes as int64 values without copying on little-endian hosts."""
+    if sys.byteorder == 'little':
+        return view.cast('q')
+    values = array('q', bytes(view))  # pragma: no cover
+    values.byteswap()  # pragma: no cover
+    return values  # pragma: no cover
+
+
+def _sections(view, start, lengths, size):
+    """Return int64 sections of lengths from start of view followed by size
+    bytes of data, or None if view is too short.
+
+    """
+    sections = []
+    for length in (*lengths, None):
+        stop = start + (size if length is None else 8 * length)
+        if len(view) < stop:
+            return None
+        section = view[start:stop]
+        sections.append(section if length is None else _int64s(section))
+        start = stop
+    return sections
+
+
+def _tobytes(values):
+    """Little-endian bytes of int64 array."""
+    if sys.byteorder != 'little':
+        values = array('q', values)  # pragma: no cover
+        values.byteswap()  # pragma: no cover
+    return values.tobytes()
+
+
+def dump(grammar, file):
+    """Write grammar to binary file object.
+
+    Productions are numbered in order without gaps, as after rules of a
+    `GrammarView` were deleted.
+
+    """
+    # pylint: disable=unidiomatic-typecheck
+    terminals = {}
+    table = []
+    bodies = array('q')
+    offsets = array('q', [0])
+    numbers = {value: index for index, value in enumerate(sorted(grammar))}
+    for production in numbers:
+        for value in grammar[production]:
+            if type(value) is Production:
+                bodies.append(~numbers[value])
+                continue
+            key = type(value), value
+            index = terminals.get(key)
+            if index is None:
+                index = terminals[key] = len(table)
+                table.append(encode_terminal(value))
+            bodies.append(index)
+        offsets.append(len(bodies))
+    terminal_offsets = array('q', [0])
+    for data in table:
+        terminal_offsets.append(terminal_offsets[-1] + len(data))
+    blob = b''.join(table)
+    header = HEADER.pack(
+        MAGIC, VERSION, 0, len(grammar), len(bodies), len(table), len(blob)
+    )
+    file.write(header)
+    file.write(_tobytes(offsets))
+    file.write(_tobytes(bodies))
+    file.write(_tobytes(terminal_offsets))
+    file.write(blob)
+    file.write(bytes(_pad(len(blob))))
+
+
+def dumps(grammar):
+    """Return grammar as binary bytes."""
+    buffer = io.BytesIO()
+    dump(grammar, buffer)
+    return buffer.getvalue()
+
+
+def load(file):
+    """Memory-map binary grammar from path or binary file object.
+
+    File objects without a file descriptor, like `io.BytesIO`, are read into
+    memory instead.
+
+    """
+    if hasattr(file, 'fileno'):
+        try:
+            fileno = file.fileno()
+        except io.UnsupportedOperation:
+            return MappedGrammar(file.read())
+        buffer = mmap.mmap(fileno, 0, access=mmap.ACCESS_READ)
+    else:
+        with open(file, 'rb') as reader:
+            buffer = mmap.mmap(reader.fileno(), 0, access=mmap.ACCESS_READ)
+    return MappedGrammar(buffer)
+
+
+class MappedGrammar(Mapping):
+    """Read-only grammar backed by a buffer in the binary format.
+
+    Production bodies are decoded on access and terminal values are decoded
+    at most once, so opening even a very large file is immediate. Terminals
+    stored with pickle are unpickled on access: only load trusted files.
+
+    """
+
+    # pylint: disable=unidiomatic-typecheck
+
+    def __init__(self, buffer):
+        view = memoryview(buffer)
+        if len(view) < HEADER.size:
+            raise ValueError('truncated grammar header')
+        fields = HEADER.unpack_from(view)
+        magic, version, _, productions, symbols, terminals, size = fields
+        if magic != MAGIC:
+            raise ValueError('not a sksequitur grammar')
+        if version != VERSION:
+            raise ValueError(f'unsupported grammar version {version}')
+        lengths = productions + 1, symbols, terminals + 1
+        sections = _sections(view, HEADER.size, lengths, size)
+        if sections is None:
+            raise ValueError('truncated grammar data')
+        self._buffer = buffer
+        self._offsets = sections[0]
+        self._bodies = sections[1]
+        self._terminal_offsets = sections[2]
+        self._data = sections[3]
+        self._views = [each for each in sections if type(each) is memoryview]
+        self._terminals = {}
+
+    def close(self):
+        """Release the views and close the underlying buffer if possible.
+
+        Memory views derived from the grammar should not outlive it. While one
+        is alive the memory map can not be closed; it is then closed when the
+        last view is garbage collected.
+
+        """
+        for view in self._views:
+            view.release()
+        close = getattr(self._buffer, 'close', None)
+        self._buffer = None
+        if close is not None:
+            try:
+                close()
+            except BufferError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __iter__(self):
+        return map(Production, range(len(self)))
+
+    def __contains__(self, production):
+        return type(production) in (int, Production) and (
+            0 <= production < len(self)
+        )
+
+    def __getitem__(self, production):
+        if production not in self:
+            raise KeyError(production)
+        start = self._offsets[production]
+        stop = self._offsets[production + 1]
+        return [self._value(code) for code in self._bodies[start:stop]]
+
+    def _value(self, code):
+        """Decode body code as production or terminal value."""
+        if code < 0:
+            return Production(~code)
+        terminals = self._terminals
+        if code in terminals:
+            return terminals[code]
+        start = self._terminal_offsets[code]
+        stop = self._terminal_offsets[code + 1]
+        value = terminals[code] = decode_terminal(self._data[start:stop])
+        return value
+
+    def _postorder(self):
+        """Productions reachable from the start rule, children first."""
+        offsets = self._offsets
+        bodies = self._bodies
+        seen = bytearray(len(self))
+        seen[0] = 1
+        order = []
+        stack = [(0, offsets[0])]
+        while stack:
+            production, index = stack[-1]
+            if index == offsets[production + 1]:
+                stack.pop()
+                order.append(production)
+                continue
+            stack[-1] = production, index + 1
+            code = bodies[index]
+            if code < 0 and not seen[~code]:
+                seen[~code] = 1
+                stack.append((~code, offsets[~code]))
+        return order
+
+    def lengths(self):
+        """Return lengths of productions."""
+        offsets = self._offsets
+        bodies = self._bodies
+        _lengths = [0] * len(self)
+        for production in self._postorder():
+            start = offsets[production]
+            stop = offsets[production + 1]
+            length = 0
+            for code in bodies[start:stop]:
+                length += _lengths[~code] if code < 0 else 1
+            _lengths[production] = length
+        return Counter(dict(zip(self, _lengths)))
+
+    def counts(self):
+        """Return counts of productions."""
+        _counts = Counter(
+            Production(~code) for code in self._bodies if code < 0
+        )
+        _counts[Production(0)] = 1
+        return _counts
+
+    def expand(self, production):
+        """Generator to expand production."""
+        offsets = self._offsets
+        bodies = self._bodies
+        value = self._value
+        stack = [(offsets[production], offsets[production + 1])]
+        while stack:
+            start, stop = stack.pop()
+            while start < stop:
+                code = bodies[start]
+                start += 1
+                if code < 0:
+                    stack.append((start, stop))
+                    start = offsets[~code]
+                    stop = offsets[~code + 1]
+                else:
+                    yield value(code)
+
+
+def _parser_bodies(parser):
+    """Return rules, bodies, offsets, symbol positions and terminal table of
+    parser in the parser state layout.
+
+    """
+    # pylint: disable=unidiomatic-typecheck
+    symbols = parser.symbols
+    rules = parser.documents
+    numbers = {rule: index for index, rule in enumerate(rules)}
+    terminals = {}
+    table = []
+    if symbols is not None:
+        table.extend(map(encode_terminal, symbols.values))
+    positions = {}
+    bodies = array('q')
+    offsets = array('q', [0])
+    for rule in rules:
+        symbol = rule.next_symbol
+        while symbol is not rule:
+            positions[symbol] = len(bodies)
+            value = symbol.value
+            symbol = symbol.next_symbol
+            if type(value) is Rule:
+                if value not in numbers:
+                    numbers[value] = len(rules)
+                    rules.append(value)
+                bodies.append(~numbers[value])
+                continue
+            if symbols is not None:
+                bodies.append(value)
+                continue
+            key = type(value), value
+            index = terminals.get(key)
+            if index is None:
+                index = terminals[key] = len(table)
+                table.append(encode_terminal(value))
+            bodies.append(index)
+        offsets.append(len(bodies))
+    return rules, bodies, offsets, positions, table
+
+
+def dump_parser(parser, file):
+    """Write the state of parser to binary file object.
+
+    Rules are numbered breadth first from the start rules of the documents,
+    which come first. After the header, int64 sections hold the rule offsets,
+    the rule bodies and, for each entry of the bigram table, the index in the
+    bodies of its symbol. The terminal offsets and data follow as in a
+    grammar. With a symbol table, terminal codes are ids and the terminals
+    are the table values.
+
+    """
+    rules, bodies, offsets, positions, table = _parser_bodies(parser)
+    entries = array('q', map(positions.__getitem__, parser.bigrams.values()))
+    terminal_offsets = array('q', [0])
+    for data in table:
+        terminal_offsets.append(terminal_offsets[-1] + len(data))
+    blob = b''.join(table)
+    header = PARSER_HEADER.pack(
+        PARSER_MAGIC,
+        PARSER_VERSION,
+        0 if parser.symbols is None else INTERNED,
+        len(rules),
+        len(bodies),
+        len(parser.documents),
+        len(entries),
+        len(table),
+        len(blob),
+    )
+    file.write(header)
+    for values in (offsets, bodies, entries, terminal_offsets):
+        file.write(_tobytes(values))
+    file.write(blob)
+    file.write(bytes(_pad(len(blob))))
+
+
+def _decode_terminals(offsets, data):
+    """Return the terminals of data split at offsets."""
+    values = []
+    for index in range(len(offsets) - 1):
+        start = offsets[index]
+        stop = offsets[index + 1]
+        values.append(decode_terminal(data[start:stop]))
+    return values
+
+
+def _parser_header(view):
+    """Return flags, documents, section lengths and data size from the parser
+    state header of view.
+
+    """
+    if len(view) < PARSER_HEADER.size:
+        raise ValueError('truncated parser state header')
+    fields = PARSER_HEADER.unpack_from(view)
+    magic, version, flags, rules, symbols, documents, entries = fields[:7]
+    terminals, size = fields[7:]
+    if magic != PARSER_MAGIC:
+        raise ValueError('not a sksequitur parser state')
+    if version != PARSER_VERSION:
+        raise ValueError(f'unsupported parser state version {version}')
+    return flags, documents, (rules + 1, symbols, entries, terminals + 1), size
+
+
+def read_parser(file):
+    """Read parser state written by `dump_parser` from binary file object.
+
+    Return the flags, the number of documents, the rule offsets, the bodies,
+    the bigram entries and the decoded terminals.
+
+    """
+    view = memoryview(file.read())
+    flags, documents, lengths, size = _parser_header(view)
+    sections = _sections(view, PARSER_HEADER.size, lengths, size)
+    if sections is None:
+        raise ValueError('truncated parser state data')
+    offsets, bodies, positions, terminal_offsets, data = sections
+    values = _decode_terminals(terminal_offsets, data)
+    return flags, documents, offsets, bodies, positions, values
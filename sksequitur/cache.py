@@ -0,0 +1,221 @@
+"""SciKit Sequitur Cache
+
+Bounded cache of flattened production expansions for repeated `expand` and
+slice requests on one grammar:
+
+    cache = grammar.cache(budget=1 << 26)
+    grammar[1000:2000]
+    print(cache.hits, cache.misses, cache.nbytes)
+"""
+
+import struct
+import sys
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+from .api import Production
+
+# Size of a tuple is that of the empty tuple and a pointer per value.
+_TUPLE = sys.getsizeof(())
+_POINTER = struct.calcsize('P')
+
+
+class ExpansionCache:
+    """Least recently used expansions of a grammar under a byte budget.
+
+    Expansions are stored as tuples and `nbytes` counts the size of the
+    tuples, not of the values they share with the grammar. Building an
+    expansion copies the cached expansions of its productions, so hot
+    productions are flattened once and later requests are tuple copies and
+    slices. The start production, whose expansion is the whole sequence, and
+    productions with expansions larger than `budget` are never kept, and
+    expanding or slicing them descends into their bodies instead.
+
+    `hits` and `misses` count requests for a production expansion, including
+    those made while building or slicing larger ones.
+
+    """
+
+    # pylint: disable=protected-access
+
+    def __init__(self, grammar, budget=1 << 24):
+        if budget < 0:
+            raise ValueError('budget must be non-negative')
+        self.grammar = grammar
+        self.budget = budget
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, production):
+        return production in self._entries
+
+    def clear(self):
+        """Remove every expansion, as after the grammar changes."""
+        self._entries.clear()
+        self.nbytes = 0
+
+    def get(self, production):
+        """Return the expansion of production as a tuple."""
+        return self._build(Production(production))
+
+    def expand(self, production):
+        """Generator of the expansion of production.
+
+        Productions too large to keep are descended so they are never
+        materialized. Others are copied from their cached expansions.
+
+        """
+        # pylint: disable=unidiomatic-typecheck
+        lengths = self._lengths()
+        entries = self._entries
+        stack = [iter([Production(production)])]
+        while stack:
+            for value in stack[-1]:
+                if type(value) is not Production:
+                    yield value
+                    continue
+                expansion = entries.get(value)
+                if expansion is not None:
+                    self.hits += 1
+                    entries.move_to_end(value)
+                    yield from expansion
+                elif self._keeps(value, lengths[value]):
+                    yield from self._build(value)
+                else:
+                    stack.append(iter(self.grammar[value]))
+                    break
+            else:
+                stack.pop()
+
+    def slice(self, start, stop):
+        """Return values of the start expansion from start to stop.
+
+        Productions wholly inside the range are copied from their cached
+        expansions. Only the productions on the boundaries are descended.
+
+        """
+        # pylint: disable=unidiomatic-typecheck
+        lengths = self._lengths()
+        entries = self._entries
+        start = max(start, 0)
+        stop = min(stop, lengths[Production(0)])
+        values = []
+        stack = [(Production(0), start, stop)] if start < stop else []
+        while stack:
+            value, start, stop = stack.pop()
+            if type(value) is not Production:
+                values.append(value)
+                continue
+            whole = stop - start == lengths[value]
+            expansion = entries.get(value)
+            if expansion is not None:
+                self.hits += 1
+                entries.move_to_end(value)
+            elif whole and self._keeps(value, lengths[value]):
+                expansion = self._build(value)
+            else:
+                parts = self._parts(value, start, stop, lengths)
+                stack.extend(reversed(parts))
+                continue
+            values.extend(expansion if whole else expansion[start:stop])
+        return values
+
+    def _lengths(self):
+        """Return the expansion lengths of the grammar."""
+        grammar = self.grammar
+        grammar._size()
+        return grammar._sizes
+
+    def _keeps(self, production, length):
+        """Return whether the expansion of production, of length values, is
+        kept once built.
+
+        """
+        size = _TUPLE + _POINTER * length
+        return production != Production(0) and size <= self.budget
+
+    def _parts(self, production, start, stop, lengths):
+        """Return values of the body of production overlapping start to stop
+        with their ranges, relative to each value.
+
+        """
+        # pylint: disable=unidiomatic-typecheck
+        body = self.grammar[production]
+        offsets = self.grammar._prefix_offsets(production)
+        first = bisect_right(offsets, start) - 1
+        last = bisect_left(offsets, stop)
+        parts = [
+            (value, 0, lengths[value] if type(value) is Production else 1)
+            for value in body[first:last]
+        ]
+        value, low, high = parts[0]
+        parts[0] = value, start - offsets[first], high
+        value, low, high = parts[-1]
+        parts[-1] = value, low, stop - offsets[last - 1]
+        return parts
+
+    def _lookup(self, production, built):
+        """Add the cached expansion of production to built, if any."""
+        expansion = self._entries.get(production)
+        if expansion is None:
+            return False
+        self.hits += 1
+        self._entries.move_to_end(production)
+        built[production] = expansion
+        return True
+
+    def _build(self, production):
+        """Return the expansion of production from cached expansions.
+
+        Uncached productions are built children first with an explicit stack
+        so deep grammars do not hit the recursion limit.
+
+        """
+        # pylint: disable=unidiomatic-typecheck
+        grammar = self.grammar
+        built = {}
+        stack = [production]
+        while stack:
+            current = stack[-1]
+            if current in built or self._lookup(current, built):
+                stack.pop()
+                continue
+            body = grammar[current]
+            missing = [
+                value
+                for value in body
+                if type(value) is Production
+                and value not in built
+                and not self._lookup(value, built)
+            ]
+            if missing:
+                stack.extend(missing)
+                continue
+            values = []
+            for value in body:
+                if type(value) is Production:
+                    values.extend(built[value])
+                else:
+                    values.append(value)
+            expansion = built[current] = tuple(values)
+            self.misses += 1
+            self._store(current, expansion)
+            stack.pop()
+        return built[production]
+
+    def _store(self, production, expansion):
+        """Keep expansion, evicting least recently used ones over budget."""
+        size = sys.getsizeof(expansion)
+        if size > self.budget or production == Production(0):
+            return
+        entries = self._entries
+        self.nbytes += size
+        entries[production] = expansion
+        while self.nbytes > self.budget:
+            _, evicted = entries.popitem(last=False)
+            self.nbytes -= sys.getsizeof(evicted)
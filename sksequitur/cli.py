@@ -0,0 +1,200 @@
+"""SciKit Sequitur Command Line
+
+Parse files, or stdin, as characters, lines or whitespace separated words and
+write the text grammar, the binary grammar or summary statistics:
+
+    $ sksequitur --tokens words --format stats logs/*.log
+    $ sksequitur --format binary --output grammars/ logs/
+
+Directories are expanded into the files below them. Input is decoded as UTF-8,
+replacing undecodable bytes, read in large buffered chunks and fed to the
+parser incrementally. Multiple files are parsed concurrently in a process
+pool. Files that can not be read are reported and the exit status is 1.
+"""
+
+import argparse
+import io
+import pathlib
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from .api import Grammar, Production
+from .binary import dumps
+from .core import Parser
+
+BUFFER_SIZE = 1 << 20
+SUFFIXES = {'text': '.txt', 'binary': '.sksq', 'stats': '.stats.txt'}
+
+
+def _chunks(reader, size):
+    """Generator of chunks of at most size characters."""
+    while True:
+        chunk = reader.read(size)
+        if not chunk:
+            break
+        yield chunk
+
+
+def chars(reader, size):
+    """Generator of characters."""
+    for chunk in _chunks(reader, size):
+        yield from chunk
+
+
+def lines(reader, size):
+    """Generator of lines without line endings."""
+    del size  # Iterating the buffered reader reads in large chunks.
+    for line in reader:
+        yield line.rstrip('\n')
+
+
+def words(reader, size):
+    """Generator of whitespace separated words."""
+    rest = ''
+    for chunk in _chunks(reader, size):
+        parts = (rest + chunk).split()
+        rest = '' if chunk[-1].isspace() else parts.pop()
+        yield from parts
+    if rest:
+        yield rest
+
+
+TOKENIZERS = {'chars': chars, 'lines': lines, 'words': words}
+
+
+def statistics(grammar):
+    """Return summary statistics of grammar as text."""
+    start = Production(0)
+    lengths = grammar.lengths()
+    counts = grammar.counts()
+    depths = grammar.depths()
+    symbols = sum(map(len, grammar.values()))
+    rules = [production for production in grammar if production != start]
+    items = [
+        ('productions', len(grammar)),
+        ('symbols', symbols),
+        ('start length', len(grammar[start])),
+        ('expanded length', lengths[start]),
+        ('compression', f'{symbols / max(lengths[start], 1):.4f}'),
+        ('max depth', max(depths.values())),
+        ('max length', max((lengths[rule] for rule in rules), default=0)),
+        ('max count', max((counts[rule] for rule in rules), default=0)),
+    ]
+    return ''.join(f'{name}: {value}\n' for name, value in items)
+
+
+def process(path, tokens, kind, size):
+    """Parse file at path, or stdin for "-", and return output bytes."""
+    parser = Parser()
+    tokenize = TOKENIZERS[tokens]
+    if path == '-':
+        reader = io.TextIOWrapper(
+            sys.stdin.buffer, encoding='utf-8', errors='replace'
+        )
+        parser.feed(tokenize(reader, size))
+        reader.detach()
+    else:
+        with open(
+            path, encoding='utf-8', errors='replace', buffering=size
+        ) as reader:
+            parser.feed(tokenize(reader, size))
+    grammar = Grammar(parser.tree)
+    if kind == 'binary':
+        return dumps(grammar)
+    text = statistics(grammar) if kind == 'stats' else f'{grammar}\n'
+    return text.encode('utf-8')
+
+
+def _process(job):
+    try:
+        return process(*job)
+    except OSError as error:
+        return error
+
+
+def inputs(paths):
+    """Return `(path, name)` pairs of files to parse and their output names.
+
+    Directories are expanded into the files below them, in sorted order,
+    named by their path relative to the directory. Other paths are named by
+    their file name and stdin is named "stdin".
+
+    """
+    pairs = []
+    for path in paths:
+        directory = pathlib.Path(path)
+        if path == '-' or not directory.is_dir():
+            pairs.append((path, 'stdin' if path == '-' else directory.name))
+            continue
+        for file in sorted(directory.rglob('*')):
+            if file.is_file():
+                name = file.relative_to(directory).as_posix()
+                pairs.append((str(file), name))
+    return pairs
+
+
+def main(argv=None):
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        prog='sksequitur', description='Infer grammars with Sequitur.'
+    )
+    parser.add_argument(
+        'files', nargs='*', default=['-'], metavar='FILE', help='"-" is stdin'
+    )
+    parser.add_argument('-t', '--tokens', choices=TOKENIZERS, default='chars')
+    parser.add_argument('-f', '--format', choices=SUFFIXES, default='text')
+    parser.add_argument(
+        '-o', '--output', type=pathlib.Path, help='directory for output files'
+    )
+    parser.add_argument(
+        '-j', '--workers', type=int, help='processes, default CPU count'
+    )
+    parser.add_argument('--buffer-size', type=int, default=BUFFER_SIZE)
+    args = parser.parse_args(argv)
+    pairs = inputs(args.files)
+    many = len(pairs) > 1
+    if args.format == 'binary' and many and args.output is None:
+        parser.error('binary format for several files requires --output')
+    if '-' in args.files and many:
+        parser.error('stdin can not be combined with other files')
+    names = set()
+    for _, name in pairs:
+        if args.output is not None and name in names:
+            parser.error(f'several files would be written to {name!r}')
+        names.add(name)
+    jobs = [
+        (path, args.tokens, args.format, args.buffer_size) for path, _ in pairs
+    ]
+    if many and args.workers != 1:
+        with ProcessPoolExecutor(args.workers) as executor:
+            failed = write(args, pairs, executor.map(_process, jobs))
+    else:
+        failed = write(args, pairs, map(_process, jobs))
+    if failed:
+        parser.exit(1)
+
+
+def write(args, pairs, results):
+    """Write results in order, to the output directory or stdout.
+
+    Errors reading files are reported on stderr. Return whether any file
+    could not be read.
+
+    """
+    stdout = sys.stdout.buffer
+    failed = False
+    for (path, name), data in zip(pairs, results):
+        if isinstance(data, OSError):
+            print(f'sksequitur: {path}: {data.strerror}', file=sys.stderr)
+            failed = True
+            continue
+        if args.output is not None:
+            target = args.output / (name + SUFFIXES[args.format])
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_bytes(data)
+            continue
+        if len(pairs) > 1:
+            stdout.write(f'==> {path} <==\n'.encode('utf-8'))
+        stdout.write(data)
+        stdout.flush()
+    return failed
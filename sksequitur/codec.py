@@ -0,0 +1,348 @@
+"""SciKit Sequitur Codec
+
+Grammar-based compression with an adaptive range coder.
+
+The start rule is sent depth first. Symbols are numbered implicitly in order
+of first appearance: the first occurrence of a terminal is sent as an escape
+followed by its literal and the first occurrence of a rule as a definition,
+its body length and its body inline. Later occurrences send the symbol number.
+Both sides grow the same adaptive frequency model so numbers are never sent
+explicitly, as in the implicit encoding of the original Sequitur paper.
+
+The stream starts with `MAGIC` and a version byte followed by range coded
+data. Terminal literals use the tagged terminal encoding of
+`sksequitur.binary`.
+"""
+
+import io
+from itertools import islice
+
+from .api import Grammar, Production
+from .binary import decode_terminal, encode_terminal
+from .core import Parser
+
+MAGIC = b'SKSC'
+VERSION = 1
+
+_MASK = (1 << 64) - 1
+_TOP = 1 << 56
+_BOTTOM = 1 << 48
+_BUFFER_SIZE = 1 << 16
+
+# Symbols 0 and 1 of the main model, the rest are numbered implicitly.
+_NEW = 0
+_DEFINE = 1
+
+
+class _Model:
+    """Adaptive frequencies of a growable alphabet in a Fenwick tree."""
+
+    __slots__ = ('_tree', '_frequencies', 'total')
+
+    def __init__(self, size=0):
+        self._tree = [0]
+        self._frequencies = []
+        self.total = 0
+        for _ in range(size):
+            self.add()
+
+    def __len__(self):
+        return len(self._frequencies)
+
+    def add(self):
+        """Append a symbol with frequency one."""
+        tree = self._tree
+        index = len(tree)
+        lowest = index & -index
+        # Node covers (index - lowest, index]: the new symbol and the sum of
+        # the covered symbols before it.
+        value = 1 + self._prefix(index - 1) - self._prefix(index - lowest)
+        tree.append(value)
+        self._frequencies.append(1)
+        self.total += 1
+
+    def _prefix(self, index):
+        """Sum of frequencies of the first index symbols."""
+        tree = self._tree
+        total = 0
+        while index:
+            total += tree[index]
+            index &= index - 1
+        return total
+
+    def update(self, symbol):
+        """Increment the frequency of symbol."""
+        tree = self._tree
+        size = len(tree)
+        index = symbol + 1
+        while index < size:
+            tree[index] += 1
+            index += index & -index
+        self._frequencies[symbol] += 1
+        self.total += 1
+
+    def interval(self, symbol):
+        """Return cumulative frequency and frequency of symbol."""
+        return self._prefix(symbol), self._frequencies[symbol]
+
+    def find(self, target):
+        """Return symbol whose interval contains cumulative target."""
+        tree = self._tree
+        size = len(tree)
+        index = 0
+        step = 1 << (size - 1).bit_length()
+        while step:
+            child = index + step
+            if child < size and tree[child] <= target:
+                index = child
+                target -= tree[child]
+            step >>= 1
+        return index
+
+
+class _Encoder:
+    """Carry-less range encoder writing to a binary file."""
+
+    def __init__(self, file):
+        self._file = file
+        self._buffer = bytearray()
+        self._low = 0
+        self._range = _MASK
+
+    def _encode(self, start, size, total):
+        rng = self._range // total
+        low = self._low + start * rng
+        rng *= size
+        buffer = self._buffer
+        while True:
+            if (low ^ (low + rng)) >= _TOP:
+                if rng >= _BOTTOM:
+                    break
+                rng = -low & (_BOTTOM - 1)
+            buffer.append(low >> 56)
+            low = (low << 8) & _MASK
+            rng = (rng << 8) & _MASK
+        self._low = low
+        self._range = rng
+        if len(buffer) >= _BUFFER_SIZE:
+            self._file.write(buffer)
+            buffer.clear()
+
+    def symbol(self, model, symbol):
+        """Encode symbol with model and update the model."""
+        start, size = model.interval(symbol)
+        self._encode(start, size, model.total)
+        model.update(symbol)
+
+    def uint(self, model, value):
+        """Encode non-negative integer as bit length then raw bits.
+
+        The leading one bit is implied by the bit length.
+
+        """
+        bits = value.bit_length()
+        self.symbol(model, bits)
+        for shift in range(0, bits - 1, 16):
+            width = min(16, bits - 1 - shift)
+            chunk = (value >> shift) & ((1 << width) - 1)
+            self._encode(chunk, 1, 1 << width)
+
+    def octets(self, integers, octets, data):
+        """Encode bytes as their length then each octet."""
+        self.uint(integers, len(data))
+        for octet in data:
+            self.symbol(octets, octet)
+
+    def flush(self):
+        """Write the final state and buffered bytes."""
+        self._buffer.extend(self._low.to_bytes(8, 'big'))
+        self._file.write(self._buffer)
+        self._buffer.clear()
+
+
+class _Decoder:
+    """Carry-less range decoder reading from a binary file."""
+
+    def __init__(self, file):
+        self._bytes = self._read(file)
+        self._low = 0
+        self._range = _MASK
+        self._code = int.from_bytes(bytes(islice(self._bytes, 8)), 'big')
+
+    @staticmethod
+    def _read(file):
+        while True:
+            chunk = file.read(_BUFFER_SIZE)
+            if not chunk:
+                break
+            yield from chunk
+        raise ValueError('truncated compressed stream')
+
+    def _target(self, total):
+        self._range //= total
+        offset = (self._code - self._low) & _MASK
+        return min(offset // self._range, total - 1)
+
+    def _decode(self, start, size):
+        low = self._low + start * self._range
+        rng = self._range * size
+        code = self._code
+        stream = self._bytes
+        while True:
+            if (low ^ (low + rng)) >= _TOP:
+                if rng >= _BOTTOM:
+                    break
+                rng = -low & (_BOTTOM - 1)
+            code = ((code << 8) | next(stream)) & _MASK
+            low = (low << 8) & _MASK
+            rng = (rng << 8) & _MASK
+        self._low = low
+        self._range = rng
+        self._code = code
+
+    def symbol(self, model):
+        """Decode symbol with model and update the model."""
+        symbol = model.find(self._target(model.total))
+        start, size = model.interval(symbol)
+        self._decode(start, size)
+        model.update(symbol)
+        return symbol
+
+    def uint(self, model):
+        """Decode non-negative integer encoded by `_Encoder.uint`."""
+        bits = self.symbol(model)
+        if not bits:
+            return 0
+        value = 1 << (bits - 1)
+        for shift in range(0, bits - 1, 16):
+            width = min(16, bits - 1 - shift)
+            chunk = self._target(1 << width)
+            self._decode(chunk, 1)
+            value |= chunk << shift
+        return value
+
+    def octets(self, integers, octets):
+        """Decode bytes encoded by `_Encoder.octets`."""
+        size = self.uint(integers)
+        return bytes(self.symbol(octets) for _ in range(size))
+
+
+def _models():
+    """Return fresh main, integer and byte models."""
+    return _Model(2), _Model(65), _Model(256)
+
+
+def dump(grammar, file):
+    """Write grammar compressed to binary file object."""
+    # pylint: disable=unidiomatic-typecheck
+    file.write(MAGIC + bytes([VERSION]))
+    encoder = _Encoder(file)
+    main, integers, octets = _models()
+    numbers = {}
+    terminals = {}
+    start = grammar[Production(0)]
+    encoder.uint(integers, len(start))
+    stack = [iter(start)]
+    while stack:
+        for value in stack[-1]:
+            if type(value) is Production:
+                number = numbers.get(value)
+                if number is None:
+                    body = grammar[value]
+                    encoder.symbol(main, _DEFINE)
+                    encoder.uint(integers, len(body))
+                    # Numbered once its body is complete, as when decoding.
+                    stack.append(value)
+                    stack.append(iter(body))
+                    break
+                encoder.symbol(main, number)
+                continue
+            key = type(value), value
+            number = terminals.get(key)
+            if number is None:
+                encoder.symbol(main, _NEW)
+                encoder.octets(integers, octets, encode_terminal(value))
+                terminals[key] = len(main)
+                main.add()
+                continue
+            encoder.symbol(main, number)
+        else:
+            stack.pop()
+            if stack and type(stack[-1]) is Production:
+                numbers[stack.pop()] = len(main)
+                main.add()
+    encoder.flush()
+
+
+def dumps(grammar):
+    """Return grammar compressed as bytes."""
+    buffer = io.BytesIO()
+    dump(grammar, buffer)
+    return buffer.getvalue()
+
+
+def compress(iterable, file, parser=Parser):
+    """Parse iterable and write its compressed grammar to binary file."""
+    parser = parser()
+    parser.feed(iterable)
+    dump(Grammar(parser.tree), file)
+
+
+def decompress(file):
+    """Generator of the values of a compressed binary file.
+
+    Values are yielded as they are decoded, so the expansion is never held
+    in memory, only the rule bodies.
+
+    """
+    size = len(MAGIC)
+    header = file.read(size + 1)
+    if header[:size] != MAGIC:
+        raise ValueError('not a sksequitur compressed stream')
+    if header[size:] != bytes([VERSION]):
+        raise ValueError('unsupported compressed stream version')
+    decoder = _Decoder(file)
+    main, integers, octets = _models()
+    # Values of the main model symbols, rules as lists of their values.
+    symbols = [None, None]
+    frames = [([], decoder.uint(integers))]
+    while frames:
+        body, remaining = frames[-1]
+        if len(body) == remaining:
+            frames.pop()
+            if frames:
+                frames[-1][0].append(body)
+                symbols.append(body)
+                main.add()
+            continue
+        symbol = decoder.symbol(main)
+        if symbol == _DEFINE:
+            frames.append(([], decoder.uint(integers)))
+            continue
+        if symbol == _NEW:
+            value = decode_terminal(decoder.octets(integers, octets))
+            symbols.append(value)
+            main.add()
+            body.append(value)
+            yield value
+            continue
+        value = symbols[symbol]
+        body.append(value)
+        if type(value) is list:  # pylint: disable=unidiomatic-typecheck
+            yield from _expand(value)
+        else:
+            yield value
+
+
+def _expand(body):
+    """Generator of the values of a decoded rule body."""
+    # pylint: disable=unidiomatic-typecheck
+    stack = [iter(body)]
+    while stack:
+        for value in stack[-1]:
+            if type(value) is list:
+                stack.append(iter(value))
+                break
+            yield value
+        else:
+            stack.pop()
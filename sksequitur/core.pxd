@@ -1,22 +1,30 @@
+cdef dict _stats
+cdef dict _dirty
+
+
 cdef class Symbol:
-    cdef dict bigrams
     cdef Symbol next_symbol, prev_symbol
     cdef object value
-    cpdef append(self, value)
-    cpdef join(self, Symbol right)
-    cdef _remove_bigram(self)
-    cpdef check(self)
-    cdef _process_match(self, Symbol match)
-    cdef _substitute(self, Rule rule)
-    cdef _delete(self)
-    cdef _expand(self)
+    cpdef append(self, value, dict bigrams)
+    cpdef join(self, Symbol right, dict bigrams)
+    cdef _remove_bigram(self, dict bigrams)
+    cpdef check(self, dict bigrams)
+    cdef _process_match(self, Symbol match, dict bigrams)
+    cdef _substitute(self, Rule rule, dict bigrams)
+    cdef _delete(self, dict bigrams)
+    cdef _expand(self, dict bigrams)
     cdef _bigram(self)
 
 
 cdef class Rule(Symbol):
-    pass
+    cdef public Py_ssize_t count
 
 
 cdef class Parser:
     cdef dict _bigrams
     cdef Rule _tree
+    cdef list _documents
+    cdef set _dirty
+    cdef object _view
+    cdef object _symbols
+    cdef public object stats
@@ -3,6 +3,141 @@
 Python code adapted from a Javascript version written by Craig Nevill-Manning.
 """
 
+import os
+import time
+
+# Stats and sets of symbols whose rule body changed, of the parsers feeding
+# with stats or a view, keyed by the id of the parser's bigram table. Events
+# are recorded for the parser owning the table passed to the hot paths, so
+# parsers fed concurrently from several threads keep separate counts. Hot
+# paths test these globals for emptiness so tracking costs nothing when no
+# parser uses it.
+_stats: dict = {}  # pylint: disable=invalid-name
+_dirty: dict = {}  # pylint: disable=invalid-name
+
+
+def _count(bigrams, name):
+    """Count event name in the stats of the parser owning bigrams."""
+    stats = _stats.get(id(bigrams))
+    if stats is not None:
+        setattr(stats, name, getattr(stats, name) + 1)
+
+
+def _touch(bigrams, *symbols):
+    """Record changed symbols for the view of the parser owning bigrams."""
+    dirty = _dirty.get(id(bigrams))
+    if dirty is not None:
+        dirty.update(symbols)
+
+
+INTEGER_FORMATS = frozenset('bBhHiIlLqQnN')
+
+
+def as_ints(buffer):
+    """Return a flat memoryview of integers over buffer.
+
+    The buffer must be C-contiguous and hold native integers, like a NumPy
+    integer array or an `array.array`. Items are read without conversion to
+    NumPy scalars.
+
+    """
+    view = memoryview(buffer)
+    format = view.format.lstrip('@')  # pylint: disable=redefined-builtin
+    if format not in INTEGER_FORMATS:
+        raise ValueError(f'buffer format {view.format!r} is not an integer')
+    if not view.c_contiguous:
+        raise ValueError('buffer is not contiguous')
+    if view.ndim != 1 or view.format != format:
+        view = view.cast('B').cast(format)
+    return view
+
+
+class Stats:
+    """Counters of parser events.
+
+    Assign to `Parser.stats` to enable counting. Every `interval` tokens a
+    sample of (tokens, bigrams, rules) is appended to `samples` and, for
+    progress reports, `callback` is called with the stats. Events are counted
+    for the parser doing the work, also when several parsers are fed from
+    different threads at once.
+
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, interval=10_000, callback=None):
+        self.interval = interval
+        self.callback = callback
+        self.started = time.perf_counter()
+        self.tokens = 0
+        self.checks = 0
+        self.creations = 0
+        self.reuses = 0
+        self.expansions = 0
+        self.overlaps = 0
+        self.peak_bigrams = 0
+        self.samples = []
+
+    @property
+    def rules(self):
+        """Net rules created while counting.
+
+        Equals the live rule count, excluding the start rule, when stats are
+        set before the first feed.
+
+        """
+        return self.creations - self.expansions
+
+    @property
+    def rate(self):
+        """Tokens counted per second since the stats were created."""
+        return self.tokens / (time.perf_counter() - self.started)
+
+    def __repr__(self):
+        names = (
+            'tokens',
+            'checks',
+            'creations',
+            'reuses',
+            'expansions',
+            'overlaps',
+            'peak_bigrams',
+            'rules',
+        )
+        args = ', '.join(f'{name}={getattr(self, name)}' for name in names)
+        return f'{type(self).__name__}({args})'
+
+
+class SymbolTable:
+    """Intern terminal values to small integer ids.
+
+    Values are keyed by `key(value)`, or by type and value when `key` is
+    None, so each value is hashed once when interned. The first value with a
+    key is kept. A table may be shared by several parsers and grammars.
+
+    """
+
+    def __init__(self, key=None):
+        self.key = key
+        self.ids = {}
+        self.values = []
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, ident):
+        return self.values[ident]
+
+    def intern(self, value):
+        """Return the id of value, assigning the next id to new values."""
+        key = self.key
+        key = (type(value), value) if key is None else key(value)
+        ident = self.ids.get(key)
+        if ident is None:
+            ident = self.ids[key] = len(self.values)
+            self.values.append(value)
+        return ident
+
 
 class Symbol:
     """Symbol
@@ -10,34 +145,38 @@ class Symbol:
     Initializes a new symbol. If it is non-terminal, increments the reference
     count of the corresponding rule.
 
+    Symbols hold only their links and value. The bigram table is owned by the
+    parser and passed to the methods that update it.
+
     Tightly coupled with Rule. Not designed for extensibility.
 
     """
 
     # pylint: disable=protected-access,unidiomatic-typecheck
 
-    def __init__(self, value, bigrams: dict):
-        self.bigrams = bigrams
+    __slots__ = ('next_symbol', 'prev_symbol', 'value')
+
+    def __init__(self, value):
         self.next_symbol = None
         self.prev_symbol = None
         self.value = value
         if type(value) is Rule:
             rule: Rule = value
-            rule.value += 1
+            rule.count += 1
 
-    def append(self, value):
+    def append(self, value, bigrams):
         """Insert a value after this one."""
-        symbol = Symbol(value, self.bigrams)
-        symbol.join(self.next_symbol)
-        self.join(symbol)
+        symbol = Symbol(value)
+        symbol.join(self.next_symbol, bigrams)
+        self.join(symbol, bigrams)
 
-    def join(self, right):
+    def join(self, right, bigrams):
         """Link two symbols together, removing any old bigram from the hash
         table.
 
         """
         if self.next_symbol is not None:
-            self._remove_bigram()
+            self._remove_bigram(bigrams)
 
             # This is to deal with trigrams, where we only record the second
             # pair of the overlapping bigrams. When we delete the second pair,
@@ -52,7 +191,9 @@ class Symbol:
                 and type(right) is type(right.next_symbol)
                 and right.value == right.next_symbol.value
             ):
-                self.bigrams[right._bigram()] = right
+                bigrams[right._bigram()] = right
+                if _stats:
+                    _count(bigrams, 'overlaps')
 
             if (
                 self.prev_symbol is not None
@@ -62,83 +203,96 @@ class Symbol:
                 and type(self) is type(self.next_symbol)
                 and self.value == self.next_symbol.value
             ):
-                self.bigrams[self.prev_symbol._bigram()] = self.prev_symbol
+                bigrams[self.prev_symbol._bigram()] = self.prev_symbol
+                if _stats:
+                    _count(bigrams, 'overlaps')
 
         self.next_symbol = right
         right.prev_symbol = self
 
-    def _remove_bigram(self):
+    def _remove_bigram(self, bigrams):
         """Remove the bigram from the hash table."""
         bigram = self._bigram()
-        if self.bigrams.get(bigram) is self:
-            del self.bigrams[bigram]
+        if bigrams.get(bigram) is self:
+            del bigrams[bigram]
 
-    def check(self):
+    def check(self, bigrams):
         """Check a new bigram. If it appears elsewhere, deal with it by calling
         match(), otherwise insert it into the hash table.
 
         """
         if type(self) is Rule or type(self.next_symbol) is Rule:
             return False
+        if _stats:
+            _count(bigrams, 'checks')
         bigram = self._bigram()
-        match: Symbol = self.bigrams.get(bigram)
+        match: Symbol = bigrams.get(bigram)
         if match is None:
-            self.bigrams[bigram] = self
+            bigrams[bigram] = self
             return False
         if match.next_symbol is not self:
-            self._process_match(match)
+            self._process_match(match, bigrams)
         return True
 
-    def _process_match(self, match):
+    def _process_match(self, match, bigrams):
         """Process match by either reusing an existing rule or creating a new
         rule.
 
         Checks also for an underused rule.
 
         """
+        # Start rules are never referenced so their count is zero.
         if (
             type(match.prev_symbol) is Rule
+            and match.prev_symbol.count
             and type(match.next_symbol.next_symbol) is Rule
         ):
             # Reuse an existing rule.
             rule: Rule = match.prev_symbol
-            self._substitute(rule)
+            self._substitute(rule, bigrams)
+            if _stats:
+                _count(bigrams, 'reuses')
         else:
             # Create a new rule.
-            rule = Rule(0, self.bigrams)
-            rule.join(rule)
-            rule.prev_symbol.append(self.value)
-            rule.prev_symbol.append(self.next_symbol.value)
-            match._substitute(rule)
-            self._substitute(rule)
-            self.bigrams[rule.next_symbol._bigram()] = rule.next_symbol
+            rule = Rule()
+            rule.prev_symbol.append(self.value, bigrams)
+            rule.prev_symbol.append(self.next_symbol.value, bigrams)
+            match._substitute(rule, bigrams)
+            self._substitute(rule, bigrams)
+            bigrams[rule.next_symbol._bigram()] = rule.next_symbol
+            if _stats:
+                _count(bigrams, 'creations')
+            if _dirty:
+                _touch(bigrams, rule)
         # Check for an underused rule
         if type(rule.next_symbol.value) is Rule:
             target_rule: Rule = rule.next_symbol.value
-            if target_rule.value == 1:
-                rule.next_symbol._expand()
+            if target_rule.count == 1:
+                rule.next_symbol._expand(bigrams)
 
-    def _substitute(self, rule):
+    def _substitute(self, rule, bigrams):
         """Substitute symbol and previous with given rule."""
         prev = self.prev_symbol
-        prev.next_symbol._delete()
-        prev.next_symbol._delete()
-        prev.append(rule)
-        if not prev.check():
-            prev.next_symbol.check()
-
-    def _delete(self):
+        prev.next_symbol._delete(bigrams)
+        prev.next_symbol._delete(bigrams)
+        prev.append(rule, bigrams)
+        if _dirty:
+            _touch(bigrams, prev)
+        if not prev.check(bigrams):
+            prev.next_symbol.check(bigrams)
+
+    def _delete(self, bigrams):
         """Clean up for symbol deletion: removes hash table entry and decrement rule
         reference count.
 
         """
-        self.prev_symbol.join(self.next_symbol)
-        self._remove_bigram()
+        self.prev_symbol.join(self.next_symbol, bigrams)
+        self._remove_bigram(bigrams)
         if type(self.value) is Rule:
             rule: Rule = self.value
-            rule.value -= 1
+            rule.count -= 1
 
-    def _expand(self):
+    def _expand(self, bigrams):
         """This symbol is the last reference to its rule. It is deleted, and the
         contents of the rule _substituted in its place.
 
@@ -148,10 +302,14 @@ class Symbol:
         value: Rule = self.value
         first = value.next_symbol
         last = value.prev_symbol
-        self._remove_bigram()
-        left.join(first)
-        last.join(right)
-        self.bigrams[last._bigram()] = last
+        self._remove_bigram(bigrams)
+        left.join(first, bigrams)
+        last.join(right, bigrams)
+        bigrams[last._bigram()] = last
+        if _stats:
+            _count(bigrams, 'expansions')
+        if _dirty:
+            _touch(bigrams, left, value)
 
     def _bigram(self):
         """Bigram tuple pair of self value and next symbol value."""
@@ -168,22 +326,80 @@ class Rule(Symbol):
 
     The rule node is the linked list of symbols that make up the rule. It
     points forward to the first symbol in the rule, and backwards to the last
-    symbol in the rule. Its own value is a reference count recording the rule
-    utility.
+    symbol in the rule. Its value is None and `count` is the reference count
+    recording the rule utility.
 
     Tightly coupled with Symbol. Not designed for extensibility.
 
     """
 
+    __slots__ = ('count',)
+
+    def __init__(self):  # pylint: disable=super-init-not-called
+        self.next_symbol = self
+        self.prev_symbol = self
+        self.value = None
+        self.count = 0
+
+
+def _link(rules, offsets, bodies, values):
+    """Link the saved bodies of rules and return their symbols in order.
+
+    Negative codes reference rules and others index values.
+
+    """
+    nodes = []
+    for index, rule in enumerate(rules):
+        guard: Symbol = rule
+        last: Symbol = guard
+        start = offsets[index]
+        stop = offsets[index + 1]
+        for code in bodies[start:stop]:
+            symbol = Symbol(rules[~code] if code < 0 else values[code])
+            last.next_symbol = symbol
+            symbol.prev_symbol = last
+            last = symbol
+            nodes.append(symbol)
+        last.next_symbol = guard
+        guard.prev_symbol = last
+    return nodes
+
+
+def _index(nodes, positions):
+    """Return the bigram table of the symbols of nodes at positions."""
+    # pylint: disable=protected-access
+    bigrams = {}
+    for position in positions:
+        symbol: Symbol = nodes[position]
+        bigrams[symbol._bigram()] = symbol
+    return bigrams
+
 
 class Parser:
-    """Parser for Sequitur parse trees."""
+    """Parser for Sequitur parse trees.
+
+    Set `stats` to a `Stats` object to count parser events during `feed`.
 
-    def __init__(self):
+    With a `SymbolTable` as `symbols`, values are interned when fed and the
+    parse tree holds their integer ids, which are cheaper to hash in bigram
+    keys. Pass the same table to `Grammar` to translate ids back to values.
+
+    Documents added with `add_document` have their own start rule and share
+    the bigrams and rules of the parser: digrams repeated across documents
+    form rules but never span two documents. Feeding appends to the last
+    document added, so documents are parsed one after another.
+
+    """
+
+    def __init__(self, symbols=None):
         self._bigrams = {}
-        rule = Rule(0, self._bigrams)
-        rule.join(rule)
+        rule = Rule()
         self._tree = rule
+        self._documents = [rule]
+        self._symbols = symbols
+        self._dirty = None
+        self._view = None
+        self.stats = None
 
     @property
     def tree(self):
@@ -195,20 +411,157 @@ class Parser:
         """Parser bigrams."""
         return self._bigrams
 
+    @property
+    def documents(self):
+        """Roots of the start rules of the documents, the tree first."""
+        return list(self._documents)
+
+    @property
+    def symbols(self):
+        """Symbol table interning fed values, or None."""
+        return self._symbols
+
     def feed(self, iterable):
         """Feed iterable to the parser.
 
-        Iterate items in iterable and build the parse tree.
+        Iterate items in iterable and build the parse tree. Items are
+        appended to the start rule of the last document.
+
+        """
+        tree: Rule = self._documents[-1]
+        if self._symbols is not None:
+            iterable = map(self._symbols.intern, iterable)
+        if self.stats is not None or self._dirty is not None:
+            self._feed_tracked(tree, iterable)
+            return
+        bigrams = self._bigrams
+        for value in iterable:
+            tree.prev_symbol.append(value, bigrams)
+            tree.prev_symbol.prev_symbol.check(bigrams)
+
+    def feed_array(self, buffer):
+        """Feed a contiguous buffer of integers to the parser."""
+        self.feed(as_ints(buffer))
+
+    def add_document(self, iterable=()):
+        """Start a new document, feed iterable to it and return its index.
+
+        The tree is document 0. Later feeds append to the new document.
 
         """
-        tree: Rule = self._tree
+        rule = Rule()
+        self._documents.append(rule)
+        self.feed(iterable)
+        return len(self._documents) - 1
+
+    def dump(self, file):
+        """Write the parser state to binary file object.
+
+        The rules, the bigram table and any symbol table are saved in the
+        flat format of `sksequitur.binary.dump_parser`. Stats and the view
+        are not saved.
+
+        """
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        from .binary import dump_parser
+
+        dump_parser(self, file)
+
+    @classmethod
+    def load(cls, file, key=None):
+        """Return a parser restored from a binary file object written by
+        `dump`. Feeding it continues the saved parse.
+
+        Symbols are linked and the bigram table is filled from the saved
+        positions in one pass, without checking bigrams again. A saved symbol
+        table is restored with `key`.
+
+        """
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        from .binary import read_parser
+
+        flags, documents, offsets, bodies, positions, values = read_parser(
+            file
+        )
+        symbols = None
+        if flags:
+            symbols = SymbolTable(key)
+            for value in values:
+                symbols.intern(value)
+            values = range(len(values))
+        parser: Parser = cls(symbols)
+        rules = [Rule() for _ in range(len(offsets) - 1)]
+        nodes = _link(rules, offsets, bodies, values)
+        parser._bigrams = _index(nodes, positions)
+        parser._tree = rules[0]
+        parser._documents = rules[:documents]
+        return parser
+
+    def view(self):
+        """Return the live `GrammarView` of this parser, brought up to date.
+
+        The view is created on the first call. From then on feeding records
+        the changed symbols and later calls update only the productions of
+        rules changed since the previous call.
+
+        """
+        # pylint: disable=import-outside-toplevel,cyclic-import
+        if self._view is None:
+            from .api import GrammarView
+
+            self._dirty = set()
+            self._view = GrammarView(self._tree, self._symbols)
+        else:
+            self._view.update(self._dirty)
+            self._dirty.clear()
+        return self._view
+
+    def _feed_tracked(self, tree, iterable):
+        """Feed iterable to the start rule tree, counting events in `stats`
+        and recording changed rules for the view.
+
+        """
+        bigrams = self._bigrams
+        key = id(bigrams)
+        if self.stats is not None:
+            _stats[key] = self.stats
+        if self._dirty is not None:
+            _dirty[key] = self._dirty
+            self._dirty.add(tree)
+        try:
+            if self.stats is None:
+                for value in iterable:
+                    tree.prev_symbol.append(value, bigrams)
+                    tree.prev_symbol.prev_symbol.check(bigrams)
+            else:
+                self._feed_stats(tree, iterable)
+        finally:
+            _stats.pop(key, None)
+            _dirty.pop(key, None)
+
+    def _feed_stats(self, tree, iterable):
+        """Feed iterable to the start rule tree and count events in `stats`."""
+        bigrams = self._bigrams
+        stats = self.stats
         for value in iterable:
-            tree.prev_symbol.append(value)
-            tree.prev_symbol.prev_symbol.check()
+            tree.prev_symbol.append(value, bigrams)
+            tree.prev_symbol.prev_symbol.check(bigrams)
+            stats.tokens += 1
+            stats.peak_bigrams = max(stats.peak_bigrams, len(bigrams))
+            if stats.tokens % stats.interval == 0:
+                sample = stats.tokens, len(bigrams), stats.rules
+                stats.samples.append(sample)
+                if stats.callback is not None:
+                    stats.callback(stats)
+
 
+backend = 'python'  # pylint: disable=invalid-name
 
 if __name__ == 'sksequitur.core':  # pragma: no cover
     try:
         from ._core import *  # noqa # pylint: disable=wildcard-import
     except ImportError:
-        pass
+        if os.environ.get('SKSEQUITUR_REQUIRE_CYTHON', '') not in ('', '0'):
+            raise
+    else:
+        backend = 'cython'  # pylint: disable=invalid-name
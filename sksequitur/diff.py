@@ -0,0 +1,128 @@
+"""SciKit Sequitur Diff
+
+Compare grammars by the content hashes of their productions, as returned by
+`Grammar.hashes`, without expanding them.
+"""
+
+from .api import Production, topological
+
+
+def _cover(grammar, order, lengths, shared):
+    """Return the number of values of each production expansion inside
+    shared productions.
+
+    """
+    # pylint: disable=unidiomatic-typecheck
+    covered = {}
+    for production in reversed(order):
+        if production in shared:
+            covered[production] = lengths[production]
+            continue
+        covered[production] = sum(
+            covered[value]
+            for value in grammar[production]
+            if type(value) is Production
+        )
+    return covered
+
+
+def _keys(grammar):
+    """Return `(hash, length)` keys of productions, in topological order,
+    and the lengths of grammar.
+
+    """
+    hashes = grammar.hashes()
+    lengths = grammar.lengths()
+    keys = {
+        production: (hashes[production], lengths[production])
+        for production in topological(grammar)
+    }
+    return keys, lengths
+
+
+class Comparison:
+    """Shared and novel content of two grammars returned by `Grammar.compare`.
+
+    Productions are matched by the content hash and length of their
+    expansions, so nothing is expanded and the cost is linear in the sizes of
+    both grammars. Different expansions with equal hashes are possible: a
+    pair of expansions of length n collides with probability up to about
+    n / 2**61 when terminal hashes behave randomly, and the fixed base lets
+    colliding inputs be crafted.
+
+    * `shared`: maps productions of `grammar` to productions of `other` with
+      the same expansion.
+    * `similarity`: fraction of the values of both start expansions inside
+      shared productions. Equal sequences score 1.0 and grammars without a
+      shared production 0.0. Terminals are never matched alone, so terminals
+      of the start rule count as novel.
+
+    """
+
+    # pylint: disable=too-few-public-methods
+
+    __slots__ = ('grammar', 'other', 'shared', 'similarity', '_covered')
+
+    def __init__(self, grammar, other):
+        start = Production(0)
+        keys, lengths = _keys(grammar)
+        other_keys, other_lengths = _keys(other)
+        index = {key: production for production, key in other_keys.items()}
+        self.grammar = grammar
+        self.other = other
+        self.shared = {
+            production: index[key]
+            for production, key in keys.items()
+            if key in index
+        }
+        found = set(keys.values())
+        other_shared = {
+            production
+            for production, key in other_keys.items()
+            if key in found
+        }
+        covered = _cover(grammar, list(keys), lengths, self.shared)
+        other_covered = _cover(
+            other, list(other_keys), other_lengths, other_shared
+        )
+        self._covered = covered, lengths
+        total = lengths[start] + other_lengths[start]
+        both = covered[start] + other_covered[start]
+        self.similarity = both / total if total else 1.0
+
+    def regions(self):
+        """Generator of `(start, stop, production)` regions of the start
+        expansion of `grammar`, in order.
+
+        Shared regions name the production of `other` with the same content.
+        Novel regions have production None and adjacent ones are merged.
+        Productions without shared content are not descended into, so the
+        work is proportional to the regions and the productions visited.
+
+        """
+        # pylint: disable=unidiomatic-typecheck
+        covered, lengths = self._covered
+        shared = self.shared
+        grammar = self.grammar
+        start = position = 0
+        stack = [iter([Production(0)])]
+        while stack:
+            for value in stack[-1]:
+                if type(value) is not Production:
+                    position += 1
+                    continue
+                if value in shared and lengths[value]:
+                    if start < position:
+                        yield start, position, None
+                    start = position + lengths[value]
+                    yield position, start, shared[value]
+                    position = start
+                    continue
+                if covered[value]:
+                    stack.append(iter(grammar[value]))
+                    break
+                position += lengths[value]
+            else:
+                stack.pop()
+        if start < position:
+            yield start, position, None
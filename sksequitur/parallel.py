@@ -0,0 +1,238 @@
+"""SciKit Sequitur Parallel
+
+Parse independent chunks in a process pool and merge their grammars.
+
+Chunks are parsed in worker processes and shipped back to the parent in the
+compact binary format. The parent unifies identical productions across chunks
+and then reduces the merged grammar: every production body is re-parsed as an
+opaque sequence, separated by unique private tokens, so that digrams repeated
+across chunks form new rules, and productions used only once are inlined. The
+reduction repeats until no production is inlined, which restores digram
+uniqueness and rule utility. It works on the grammars, not the input, so its
+cost is proportional to the size of the merged grammar.
+
+Split a long sequence at `Mark` boundaries so that no rule would have spanned
+two chunks.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+
+from .api import Grammar, Mark, Production, topological
+from .binary import MappedGrammar, dumps
+from .core import Parser, Rule
+
+
+class _Ref:
+    """Opaque token for a production while reducing a merged grammar."""
+
+    # pylint: disable=too-few-public-methods
+    __slots__ = ()
+
+
+class _Stop:
+    """Separator of bodies while re-parsing. Unlike `Mark` values of the
+    input, it never appears in a body, and it never repeats in a bigram.
+
+    """
+
+    # pylint: disable=too-few-public-methods
+    __slots__ = ()
+
+
+def _parse_chunk(args):
+    """Parse one chunk and return its grammar in binary format."""
+    iterable, parser = args
+    parser = parser()
+    parser.feed(iterable)
+    return dumps(Grammar(parser.tree))
+
+
+def _unify(grammars):
+    """Return bodies keyed by token and the start body of all grammars.
+
+    Productions with identical expansions share one token.
+
+    """
+    # pylint: disable=unidiomatic-typecheck
+    tokens = {}
+    bodies = {}
+    start = []
+    for grammar in grammars:
+        local = {}
+        for production in reversed(topological(grammar)):
+            body = [
+                local[value] if type(value) is Production else value
+                for value in grammar[production]
+            ]
+            if production == 0:
+                start.extend(body)
+                continue
+            key = tuple((type(value) is _Ref, value) for value in body)
+            token = tokens.get(key)
+            if token is None:
+                token = tokens[key] = _Ref()
+                bodies[token] = body
+            local[production] = token
+    return bodies, start
+
+
+def _reparse(bodies, start):
+    """Re-parse bodies and start body, return new bodies and start body."""
+    # pylint: disable=unidiomatic-typecheck
+    parser = Parser()
+    for body in bodies.values():
+        parser.feed(body)
+        parser.feed([_Stop()])
+    parser.feed(start)
+    tokens = {}
+
+    def _values(rule):
+        values = []
+        symbol = rule.next_symbol
+        while type(symbol) is not Rule:
+            value = symbol.value
+            if type(value) is Rule:
+                token = tokens.get(value)
+                if token is None:
+                    token = tokens[value] = _Ref()
+                    pending.append(value)
+                value = token
+            values.append(value)
+            symbol = symbol.next_symbol
+        return values
+
+    pending = []
+    segments = [[]]
+    for value in _values(parser.tree):
+        if type(value) is _Stop:
+            segments.append([])
+        else:
+            segments[-1].append(value)
+    result = dict(zip(bodies, segments))
+    while pending:
+        rule = pending.pop()
+        result[tokens[rule]] = _values(rule)
+    return result, segments[-1]
+
+
+def _inline(bodies, start):
+    """Inline productions used once, return whether any were inlined."""
+    # pylint: disable=unidiomatic-typecheck
+    aliases = {}
+    for token, body in bodies.items():
+        if len(body) == 1 and type(body[0]) is _Ref:
+            aliases[token] = body[0]
+    for token in aliases:
+        del bodies[token]
+    uses = dict.fromkeys(bodies, 0)
+    for value in chain(start, *bodies.values()):
+        if type(value) is _Ref:
+            uses[aliases.get(value, value)] += 1
+    single = {token for token, count in uses.items() if count == 1}
+    if not (aliases or single):
+        return False
+
+    def _rewrite(body):
+        values = []
+        stack = [iter(body)]
+        while stack:
+            for value in stack[-1]:
+                if type(value) is _Ref:
+                    value = aliases.get(value, value)
+                    if value in single:
+                        stack.append(iter(bodies[value]))
+                        break
+                values.append(value)
+            else:
+                stack.pop()
+        return values
+
+    start[:] = _rewrite(start)
+    rewritten = {
+        token: _rewrite(body)
+        for token, body in bodies.items()
+        if token not in single
+    }
+    bodies.clear()
+    bodies.update(rewritten)
+    return True
+
+
+def _tree(bodies, start):
+    """Materialize bodies and start body as a parse tree."""
+    # pylint: disable=unidiomatic-typecheck
+    scratch = {}
+    rules = {}
+
+    def _rule(token):
+        rule = rules.get(token)
+        if rule is None:
+            rule = rules[token] = Rule()
+            pending.append(token)
+        return rule
+
+    pending = []
+    tree = _rule(None)
+    while pending:
+        token = pending.pop()
+        rule = rules[token]
+        for value in start if token is None else bodies[token]:
+            if type(value) is _Ref:
+                value = _rule(value)
+            rule.prev_symbol.append(value, scratch)
+    return tree
+
+
+def merge(grammars):
+    """Merge grammars of consecutive chunks into one `Grammar`.
+
+    The start rule of the result expands to the concatenated expansions of
+    the start rules of `grammars`.
+
+    """
+    bodies, start = _unify(grammars)
+    while True:
+        bodies, start = _reparse(bodies, start)
+        if not _inline(bodies, start):
+            break
+    return Grammar(_tree(bodies, start))
+
+
+def split(iterable, size):
+    """Generator of chunks of iterable split after `Mark` values.
+
+    Each chunk holds at least `size` values, except the last, and ends just
+    after a mark.
+
+    """
+    # pylint: disable=unidiomatic-typecheck
+    iterator = iter(iterable)
+    chunk = []
+    while True:
+        values = list(islice(iterator, size))
+        if not values:
+            break
+        for value in values:
+            chunk.append(value)
+            if type(value) is Mark and len(chunk) >= size:
+                yield chunk
+                chunk = []
+    if chunk:
+        yield chunk
+
+
+def parse_many(iterables, parser=Parser, max_workers=None):
+    """Parse iterables in a process pool and return the merged grammar.
+
+    Each iterable is a chunk parsed by one worker with the `parser` engine.
+    With `max_workers=1` the chunks are parsed in this process.
+
+    """
+    tasks = ((iterable, parser) for iterable in iterables)
+    if max_workers == 1:
+        results = list(map(_parse_chunk, tasks))
+    else:
+        with ProcessPoolExecutor(max_workers) as executor:
+            results = list(executor.map(_parse_chunk, tasks))
+    return merge(MappedGrammar(data) for data in results)
@@ -0,0 +1,140 @@
+"""SciKit Sequitur Profiling
+
+Split the wall time and allocations of a parse pipeline into phases:
+
+    with Profile() as profile:
+        with profile.phase('read'):
+            lines = path.read_text().splitlines()
+        with profile.phase('feed', tokens=len(lines)):
+            parser.feed(lines)
+        with profile.phase('grammar'):
+            grammar = Grammar(parser.tree)
+    print(profile)
+
+`parse(iterable, profile=True)` returns the grammar with a profile of its
+"feed" and "grammar" phases. Assign `Stats(interval, callback)` to
+`Parser.stats` for progress reports while feeding.
+"""
+
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+from .api import Grammar
+
+
+class Phase:
+    """Wall time, allocations and tokens of one phase of a `Profile`.
+
+    `allocated` is the change of the memory traced by tracemalloc over the
+    phase and `peak` the most traced above the start of the phase, in bytes.
+    Both are zero when memory is not traced.
+
+    Before Python 3.9, which added `tracemalloc.reset_peak`, a `Profile`
+    restarts its own tracing at each phase instead, so `allocated` ignores
+    memory from earlier phases freed in this one. With tracing started
+    elsewhere, which is left running, `peak` is measured from the most traced
+    since that tracing started and only bounds the phase peak from above.
+
+    """
+
+    __slots__ = ('name', 'tokens', 'seconds', 'allocated', 'peak')
+
+    def __init__(self, name, tokens=0):
+        self.name = name
+        self.tokens = tokens
+        self.seconds = 0.0
+        self.allocated = 0
+        self.peak = 0
+
+    @property
+    def rate(self):
+        """Tokens per second."""
+        return self.tokens / self.seconds if self.seconds else 0.0
+
+    def __repr__(self):
+        names = ('name', 'tokens', 'seconds', 'allocated', 'peak')
+        args = ', '.join(f'{name}={getattr(self, name)!r}' for name in names)
+        return f'{type(self).__name__}({args})'
+
+
+class Profile:
+    """Record phases of a parse pipeline.
+
+    As a context manager, memory is traced with tracemalloc, which slows
+    allocations down, until exit. Tracing started elsewhere is left running.
+
+    """
+
+    def __init__(self):
+        self.phases = []
+        self._tracing = False
+
+    def __enter__(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._tracing:
+            tracemalloc.stop()
+            self._tracing = False
+
+    def __getitem__(self, name):
+        for phase in self.phases:
+            if phase.name == name:
+                return phase
+        raise KeyError(name)
+
+    @contextmanager
+    def phase(self, name, tokens=0):
+        """Context manager timing a phase and yielding its `Phase`.
+
+        Set `tokens` on the phase when the count is known only at the end.
+
+        """
+        phase = Phase(name, tokens)
+        tracing = tracemalloc.is_tracing()
+        before = 0
+        if tracing:
+            if hasattr(tracemalloc, 'reset_peak'):
+                tracemalloc.reset_peak()
+            elif self._tracing:
+                tracemalloc.stop()
+                tracemalloc.start()
+            before, _ = tracemalloc.get_traced_memory()
+        start = time.perf_counter()
+        try:
+            yield phase
+        finally:
+            phase.seconds = time.perf_counter() - start
+            if tracing:
+                current, peak = tracemalloc.get_traced_memory()
+                phase.allocated = current - before
+                phase.peak = peak - before
+            self.phases.append(phase)
+
+    def __str__(self):
+        lines = [
+            f'{"phase":12}  {"seconds":>9}  {"tokens/sec":>12}  '
+            f'{"allocated":>12}  {"peak":>12}'
+        ]
+        for phase in self.phases:
+            lines.append(
+                f'{phase.name:12}  {phase.seconds:9.3f}  {phase.rate:12,.0f}  '
+                f'{phase.allocated:12,}  {phase.peak:12,}'
+            )
+        return '\n'.join(lines)
+
+
+def profile_parse(iterable, parser):
+    """Parse iterable with a parser engine, return grammar and `Profile`."""
+    with Profile() as profile:
+        with profile.phase('feed') as feed:
+            engine = parser()
+            engine.feed(iterable)
+        with profile.phase('grammar') as build:
+            grammar = Grammar(engine.tree)
+    feed.tokens = build.tokens = grammar.lengths()[0]
+    return grammar, profile
@@ -0,0 +1,79 @@
+"""SciKit Sequitur Readers
+
+Feed parsers from memory-mapped files instead of reading them whole:
+
+    grammar = parse_file('service.log', tokens='lines', encoding='utf-8')
+    grammar = parse_file('trace.bin', tokens='bytes')
+    grammar = parse_file('app.log', tokens=re.compile(rb'\\S+'))
+
+The file is mapped read-only and tokens are produced lazily, so only the
+parse tree grows with the input. Line and pattern tokens are deduplicated:
+identical tokens share one object, decoded once, and cost one terminal.
+"""
+
+import mmap
+import os
+import re
+
+from .api import Grammar
+from .core import Parser
+
+
+def _lines(mapped):
+    """Generator of lines of mapped without line endings."""
+    for line in iter(mapped.readline, b''):
+        yield line[:-1] if line.endswith(b'\n') else line
+
+
+def _matches(mapped, pattern):
+    """Generator of the text matched by pattern in mapped."""
+    for match in pattern.finditer(mapped):
+        yield match.group()
+
+
+def _interned(tokens, encoding):
+    """Generator of tokens with equal tokens sharing one object."""
+    table = {}
+    for token in tokens:
+        value = table.get(token)
+        if value is None:
+            value = token if encoding is None else token.decode(encoding)
+            table[token] = value
+        yield value
+
+
+def _tokens(path, tokens, encoding):
+    """Generator of tokens of the mapped file at path."""
+    with open(path, 'rb') as file:
+        if not os.fstat(file.fileno()).st_size:
+            return  # Empty files can not be mapped.
+        access = mmap.ACCESS_READ
+        with mmap.mmap(file.fileno(), 0, access=access) as mapped:
+            if tokens == 'bytes':
+                with memoryview(mapped) as view:
+                    yield from view
+            elif tokens == 'lines':
+                yield from _interned(_lines(mapped), encoding)
+            else:
+                yield from _interned(_matches(mapped, tokens), encoding)
+
+
+def read_tokens(path, tokens='lines', encoding=None):
+    """Return generator of tokens of the file at path, read through `mmap`.
+
+    Tokens are "bytes", yielding integers, "lines", yielding lines without
+    their line endings, or a compiled bytes regular expression, yielding the
+    text of each match. Lines and matches are bytes unless `encoding` is
+    given and equal ones are the same object.
+
+    """
+    if not isinstance(tokens, re.Pattern) and tokens not in ('bytes', 'lines'):
+        raise ValueError(f'unknown tokens {tokens!r}')
+    return _tokens(path, tokens, encoding)
+
+
+def parse_file(path, tokens='lines', encoding=None, parser=Parser):
+    """Parse the file at path with `read_tokens` and return its `Grammar`."""
+    parser = parser()
+    parser.feed(read_tokens(path, tokens, encoding))
+    return Grammar(parser.tree)
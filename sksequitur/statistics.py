@@ -0,0 +1,131 @@
+"""SciKit Sequitur Statistics
+
+Columns of occurrence counts, expansion lengths, savings and depths of the
+productions of a grammar, as returned by `Grammar.statistics`, computed
+without expanding anything:
+
+    statistics = grammar.statistics()
+    top = statistics.top(100)
+"""
+
+import heapq
+from array import array
+from functools import partial
+
+from .api import Production
+
+
+def _ascend(start, body_of, size):
+    """Return productions in topological order, parents first, and lengths
+    of their expansions, as a list indexed by production.
+
+    One depth-first walk orders the productions and sums the lengths of
+    each body as it is visited, so every body is read once.
+
+    """
+    # pylint: disable=unidiomatic-typecheck
+    order = []
+    lengths = [-1] * size
+    lengths[start] = length = 0
+    stack = [(start, iter(body_of(start)))]
+    while stack:
+        production, values = stack[-1]
+        for value in values:
+            if type(value) is not Production:
+                length += 1
+            elif lengths[value] < 0:
+                # Keep the partial length of production while descending.
+                lengths[production] = length
+                lengths[value] = length = 0
+                stack.append((value, iter(body_of(value))))
+                break
+            else:
+                length += lengths[value]
+        else:
+            stack.pop()
+            order.append(production)
+            lengths[production] = length
+            if stack:
+                length += lengths[stack[-1][0]]
+    order.reverse()
+    return order, lengths
+
+
+def _descend(order, body_of, size):
+    """Return occurrence counts and minimum depths of productions in
+    topological order, as lists indexed by production.
+
+    """
+    # pylint: disable=unidiomatic-typecheck
+    counts = [0] * size
+    depths = [size] * size
+    counts[order[0]] = 1
+    depths[order[0]] = 0
+    for production in order:
+        total = counts[production]
+        depth = depths[production] + 1
+        for value in body_of(production):
+            if type(value) is Production:
+                counts[value] += total
+                if depth < depths[value]:
+                    depths[value] = depth
+    return counts, depths
+
+
+class Statistics:
+    """Columns of production statistics returned by `Grammar.statistics`.
+
+    Row `i` describes `productions[i]`. Rows are in topological order,
+    parents first, so row 0 is the start production. Columns are int64
+    `array.array` objects: `numpy.frombuffer(column, numpy.int64)` views one
+    without copying.
+
+    * `counts`: occurrences in the expansion of the start production.
+    * `lengths`: length of the expansion of the production.
+    * `savings`: ``(count - 1) * length``, values of the start expansion
+      that repeat an earlier occurrence of the production.
+    * `depths`: minimum depth below the start production.
+
+    """
+
+    __slots__ = ('productions', 'counts', 'lengths', 'savings', 'depths')
+
+    def __init__(self, productions, counts, lengths, savings, depths):
+        # pylint: disable=too-many-arguments
+        self.productions = productions
+        self.counts = counts
+        self.lengths = lengths
+        self.savings = savings
+        self.depths = depths
+
+    def __len__(self):
+        return len(self.productions)
+
+    def top(self, k, column='savings'):
+        """Return the k productions with the largest values in column,
+        largest first.
+
+        """
+        values = getattr(self, column)
+        rows = heapq.nlargest(k, range(len(values)), key=values.__getitem__)
+        return [Production(self.productions[row]) for row in rows]
+
+
+def statistics(grammar):
+    """Return `Statistics` of the productions of grammar reachable from the
+    start production.
+
+    """
+    body_of = partial(dict.__getitem__, grammar)
+    size = max(grammar) + 1
+    order, lengths = _ascend(Production(0), body_of, size)
+    counts, depths = _descend(order, body_of, size)
+    columns = [
+        array('q', map(column.__getitem__, order))
+        for column in (counts, lengths, depths)
+    ]
+    counts, lengths, depths = columns
+    pairs = zip(counts, lengths)
+    savings = array('q', [(total - 1) * length for total, length in pairs])
+    productions = array('q', order)
+    return Statistics(productions, counts, lengths, savings, depths)
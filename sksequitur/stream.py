@@ -0,0 +1,272 @@
+"""SciKit Sequitur Stream
+
+Streaming, bounded-memory parsing with incremental grammar checkpoints.
+"""
+
+from array import array
+from itertools import count, islice
+
+from .api import Production
+from .arrays import GUARD, NIL, TYPECODE, ArrayParser
+
+
+class Checkpoint(dict):
+    """Productions that changed since the previous checkpoint.
+
+    Maps each created or modified production to its current body. The start
+    rule is production 0 and holds only the live, not yet evicted, part of the
+    start rule. Productions removed from the live grammar are listed in
+    `deleted` and values evicted from the start rule, in order, in `frozen`.
+
+    Rule expansions never change, so applying every checkpoint in order with
+    `dict.update` yields definitions for all productions referenced by frozen
+    values and by the live start rule.
+
+    """
+
+    def __init__(self, productions, deleted, frozen):
+        super().__init__(productions)
+        self.deleted = deleted
+        self.frozen = frozen
+
+
+class StreamParser(ArrayParser):
+    """Streaming parser with checkpoints and an optional window policy.
+
+    Every rule gets a production number that is stable for its lifetime. When
+    `window` is given, symbols beyond the last `window` symbols of the start
+    rule are frozen: they are evicted from the parse tree and the digram
+    index, and rules no longer referenced by live symbols are evicted with
+    them. Terminal values are interned only while live symbols use them.
+    Resident memory is then bounded by the window rather than the input.
+
+    Frozen values, captured bodies and deleted productions accumulate until
+    they are handed over by `checkpoint`, so call it regularly to keep memory
+    bounded.
+
+    """
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(self, window=None):
+        if window is not None and window < 1:
+            raise ValueError('window must be positive')
+        self._window = window
+        self._length = 0
+        self._owner = array(TYPECODE)
+        self._productions = {}
+        self._counter = count()
+        self._dirty = set()
+        self._fresh = set()
+        self._pinned = set()
+        self._deleted = set()
+        self._frozen = []
+        self._captured = {}
+        self._uses = []
+        self._unused = []
+        super().__init__()
+
+    @property
+    def window(self):
+        """Maximum number of live symbols in the start rule."""
+        return self._window
+
+    def __len__(self):
+        """Number of live symbols in the start rule."""
+        return self._length
+
+    def feed(self, iterable):
+        """Feed iterable to the parser.
+
+        With a window policy, the iterable is consumed in batches of at most
+        `window` items and the start rule is evicted after each batch.
+
+        """
+        window = self._window
+        if window is None:
+            super().feed(iterable)
+            return
+        iterator = iter(iterable)
+        while True:
+            batch = list(islice(iterator, window))
+            if not batch:
+                break
+            super().feed(batch)
+            self._evict()
+
+    def checkpoint(self):
+        """Return a `Checkpoint` of the changes since the last checkpoint."""
+        productions = self._captured
+        for rule in self._dirty:
+            productions[self._productions[rule]] = self._body(rule)
+        checkpoint = Checkpoint(
+            sorted(productions.items()), self._deleted, self._frozen
+        )
+        self._dirty = set()
+        self._fresh = set()
+        self._pinned = set()
+        self._deleted = set()
+        self._frozen = []
+        self._captured = {}
+        return checkpoint
+
+    def _body(self, rule):
+        """Values of the rule body with references as productions."""
+        nexts = self._next
+        values = self._value
+        terminals = self._terminals
+        productions = self._productions
+        body = []
+        node = nexts[rule]
+        while node != rule:
+            value = values[node]
+            if value < GUARD:
+                body.append(productions[-2 - value])
+            else:
+                body.append(terminals[value])
+            node = nexts[node]
+        return body
+
+    def _pin(self, node):
+        """Value of node with a rule reference as production.
+
+        Rules referenced by values that leave the tree before the next
+        checkpoint are pinned so that their definitions are emitted.
+
+        """
+        value = self._value[node]
+        if value < GUARD:
+            rule = -2 - value
+            if rule in self._fresh:
+                self._pinned.add(rule)
+            return self._productions[rule]
+        return self._terminals[value]
+
+    def _intern(self, value):
+        if not self._unused:
+            self._uses.append(0)
+            return super()._intern(value)
+        ident = self._unused.pop()
+        self._ids[value] = ident
+        self._terminals[ident] = value
+        return ident
+
+    def _release(self, value):
+        """Drop one use of terminal id value and free it when unused."""
+        self._uses[value] -= 1
+        if self._uses[value] == 0:
+            del self._ids[self._terminals[value]]
+            self._terminals[value] = None
+            self._unused.append(value)
+
+    def _alloc(self, value):
+        if value > GUARD:
+            self._uses[value] += 1
+        return super()._alloc(value)
+
+    def _grow(self):
+        super()._grow()
+        extra = len(self._value) - len(self._owner)
+        self._owner.extend(array(TYPECODE, [NIL]) * extra)
+
+    def _new_rule(self):
+        guard = super()._new_rule()
+        self._owner[guard] = guard
+        self._productions[guard] = Production(next(self._counter))
+        self._dirty.add(guard)
+        self._fresh.add(guard)
+        return guard
+
+    def _append(self, node, value):
+        symbol = super()._append(node, value)
+        owner = self._owner[node]
+        self._owner[symbol] = owner
+        self._dirty.add(owner)
+        if owner == self._root:
+            self._length += 1
+        return symbol
+
+    def _delete(self, node):
+        owner = self._owner[node]
+        self._dirty.add(owner)
+        if owner == self._root:
+            self._length -= 1
+        value = self._value[node]
+        super()._delete(node)
+        if value > GUARD:
+            self._release(value)
+
+    def _expand(self, node):
+        # Underused rules are only ever expanded into the rule that was just
+        # created or reused, never into the start rule.
+        nexts = self._next
+        owner = self._owner[node]
+        rule = -2 - self._value[node]
+        self._dirty.add(owner)
+        self._remove_rule(rule)
+        symbol = nexts[rule]
+        while symbol != rule:
+            self._owner[symbol] = owner
+            symbol = nexts[symbol]
+        super()._expand(node)
+
+    def _remove_rule(self, rule):
+        """Record that rule is leaving the live grammar.
+
+        Rules emitted by an earlier checkpoint keep their old, still valid,
+        definition. Pinned rules that were never emitted are captured now.
+
+        """
+        production = self._productions.pop(rule)
+        self._dirty.discard(rule)
+        if rule in self._fresh:
+            self._fresh.remove(rule)
+            if rule not in self._pinned:
+                return
+            self._pinned.remove(rule)
+            nexts = self._next
+            body = []
+            node = nexts[rule]
+            while node != rule:
+                body.append(self._pin(node))
+                node = nexts[node]
+            self._captured[production] = body
+        self._deleted.add(production)
+
+    def _evict(self):
+        """Freeze and evict symbols from the start of the start rule."""
+        root = self._root
+        nexts = self._next
+        values = self._value
+        counts = self._counts
+        while self._length > self._window:
+            node = nexts[root]
+            self._frozen.append(self._pin(node))
+            value = values[node]
+            self._delete(node)
+            if value < GUARD and counts[-2 - value] == 0:
+                self._retire(-2 - value)
+
+    def _retire(self, rule):
+        """Evict rule, and the rules only it references, from the tree."""
+        nexts = self._next
+        values = self._value
+        counts = self._counts
+        rules = [rule]
+        while rules:
+            rule = rules.pop()
+            self._remove_rule(rule)
+            node = nexts[rule]
+            while node != rule:
+                self._remove_bigram(node)
+                value = values[node]
+                if value < GUARD:
+                    counts[-2 - value] -= 1
+                    if counts[-2 - value] == 0:
+                        rules.append(-2 - value)
+                else:
+                    self._release(value)
+                self._free.append(node)
+                node = nexts[node]
+            del counts[rule]
+            self._free.append(rule)
@@ -0,0 +1,147 @@
+import asyncio
+import pathlib
+import random
+import string
+import threading
+import time
+
+import pytest
+
+from sksequitur import AsyncParser, Parser, parse
+
+module_dir = pathlib.Path(__file__).parent
+
+
+async def chunks(iterable, size):
+    for start in range(0, len(iterable), size):
+        stop = start + size
+        yield iterable[start:stop]
+        await asyncio.sleep(0)
+
+
+async def ticker(stop, lags, interval=0.001):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def max_lag(work):
+    stop = asyncio.Event()
+    lags = []
+    task = asyncio.create_task(ticker(stop, lags))
+    await asyncio.sleep(0.01)
+    await work()
+    stop.set()
+    await task
+    return max(lags)
+
+
+def test_async_parser():
+    path = module_dir / 'genesis_input.txt'
+    text = path.read_text(encoding='utf-8')
+
+    async def main():
+        async with AsyncParser(maxsize=2) as parser:
+            await parser.feed(chunks(text, 100))
+            middle = await parser.grammar()
+            await parser.put(text)
+            return middle, await parser.grammar()
+
+    middle, grammar = asyncio.run(main())
+    assert middle == parse(text)
+    assert ''.join(grammar.expand(0)) == text * 2
+
+
+def test_stream_reader():
+    data = bytes(random.Random(0).choices(b'abc', k=10_000))
+
+    async def main():
+        reader = asyncio.StreamReader()
+        parser = AsyncParser(maxsize=1, batch=100)
+
+        async def produce():
+            async for chunk in chunks(data, 1000):
+                reader.feed_data(chunk)
+            reader.feed_eof()
+
+        await asyncio.gather(produce(), parser.feed(reader, size=512))
+        grammar = await parser.grammar()
+        await parser.close()
+        await parser.close()
+        return grammar
+
+    assert list(asyncio.run(main()).expand(0)) == list(data)
+
+
+class SlowParser(Parser):
+    def __init__(self):
+        super().__init__()
+        self.event = threading.Event()
+
+    def feed(self, iterable):
+        self.event.wait()
+        super().feed(iterable)
+
+
+def test_backpressure():
+    async def main():
+        parser = AsyncParser(SlowParser(), maxsize=2)
+        await parser.put('ab')
+        await parser.put('ab')
+        blocked = asyncio.ensure_future(parser.put('ab'))
+        await asyncio.sleep(0.05)
+        assert not blocked.done()
+        assert parser.pending == 2
+        cancelled = asyncio.ensure_future(parser.grammar())
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        parser.parser.event.set()
+        await blocked
+        grammar = await parser.grammar()
+        assert parser.pending == 0
+        await parser.close()
+        return grammar
+
+    assert ''.join(asyncio.run(main()).expand(0)) == 'ababab'
+
+
+def test_event_loop_latency():
+    rand = random.Random(0)
+    data = rand.choices(string.ascii_lowercase, k=20_000)
+    size = 5_000
+
+    async def blocking():
+        parser = Parser()
+        async for chunk in chunks(data, size):
+            parser.feed(chunk)
+
+    async def threaded():
+        async with AsyncParser(maxsize=2) as parser:
+            await parser.feed(chunks(data, size))
+            grammars.append(await parser.grammar())
+
+    grammars = []
+    blocking_lag = asyncio.run(max_lag(blocking))
+    threaded_lag = asyncio.run(max_lag(threaded))
+    assert threaded_lag < blocking_lag
+    assert grammars == [parse(data)]
+
+
+def test_errors():
+    with pytest.raises(ValueError, match='maxsize must be positive'):
+        AsyncParser(maxsize=0)
+    with pytest.raises(ValueError, match='batch must be positive'):
+        AsyncParser(batch=0)
+
+    async def main():
+        parser = AsyncParser()
+        await parser.put([[1], [1]])
+        await parser.put('ab')
+        with pytest.raises(TypeError):
+            await parser.grammar()
+        with pytest.raises(TypeError):
+            await parser.close()
+        assert parser.pending == 0
+
+    asyncio.run(main())
@@ -0,0 +1,89 @@
+import pathlib
+import random
+import string
+
+import pytest
+
+from sksequitur import ArrayParser, Grammar, Mark, Parser, parse
+
+module_dir = pathlib.Path(__file__).parent
+
+
+def grammars(iterable):
+    parser = Parser()
+    parser.feed(iterable)
+    array_parser = ArrayParser()
+    array_parser.feed(iterable)
+    return Grammar(parser.tree), Grammar(array_parser.tree)
+
+
+def test_array_parser():
+    parser = ArrayParser()
+    parser.feed('ab')
+    assert len(parser.bigrams) == 1
+    assert parser.terminals == ['a', 'b']
+    grammar = Grammar(parser.tree)
+    assert str(grammar) == '0 -> a b'
+    assert list(grammar.expand(0)) == ['a', 'b']
+
+
+@pytest.mark.parametrize(
+    'iterable',
+    [
+        'hello hello\n',
+        'abcabdabcabd',
+        'abbbabcbb',
+        'a' * 1000,
+        [1, 2, 3, 4, 1, 2, 3, 5, 1, 2, 3],
+        ['a', 'b', Mark(), 'a', 'b', Mark(), 'a', 'b'],
+    ],
+)
+def test_same_grammar(iterable):
+    expected, actual = grammars(iterable)
+    assert actual == expected
+    assert str(actual) == str(expected)
+
+
+@pytest.mark.parametrize('name', ['genesis', 'iamsam'])
+def test_same_fixtures(name):
+    path = module_dir / f'{name}_input.txt'
+    iterable = path.read_text(encoding='utf-8')
+    expected, actual = grammars(iterable)
+    assert str(actual) == str(expected)
+    assert list(actual.expand(0)) == list(iterable)
+
+
+def test_parse_engine():
+    grammar = parse('abcabc', parser=ArrayParser)
+    assert grammar == parse('abcabc')
+
+
+def test_same_random():
+    rand = random.Random(0)
+    for _ in range(500):
+        size = rand.randrange(1, 100)
+        iterable = rand.choices('abc', k=size)
+        expected, actual = grammars(iterable)
+        assert actual == expected
+
+
+def test_incremental_feed_and_growth():
+    rand = random.Random(0)
+    iterable = rand.choices(string.ascii_lowercase, k=5_000)
+    parser = ArrayParser()
+    for start in range(0, len(iterable), 7):
+        stop = start + 7
+        parser.feed(iterable[start:stop])
+    expected, _ = grammars(iterable)
+    assert Grammar(parser.tree) == expected
+
+
+def benchmark_array_parsing(iterable):
+    parser = ArrayParser()
+    parser.feed(iterable)
+
+
+def test_benchmark_array_parsing(benchmark):
+    rand = random.Random(0)
+    iterable = rand.choices(string.ascii_lowercase, k=100_000)
+    benchmark(benchmark_array_parsing, iterable)
@@ -0,0 +1,131 @@
+import io
+import pathlib
+
+import pytest
+
+from sksequitur import Mark, Parser, Production, binary, parse
+from sksequitur.binary import MappedGrammar, dump, dumps, load
+
+module_dir = pathlib.Path(__file__).parent
+
+
+@pytest.fixture(name='genesis')
+def fixture_genesis():
+    path = module_dir / 'genesis_input.txt'
+    return path.read_text(encoding='utf-8')
+
+
+def test_roundtrip_genesis(genesis, tmp_path):
+    grammar = parse(genesis)
+    path = tmp_path / 'genesis.sksq'
+    with open(path, 'wb') as writer:
+        dump(grammar, writer)
+    assert path.stat().st_size % 8 == 0
+    with load(path) as mapped:
+        assert len(mapped) == len(grammar)
+        assert dict(mapped) == dict(grammar)
+        assert mapped.lengths() == grammar.lengths()
+        assert mapped.counts() == grammar.counts()
+        assert ''.join(mapped.expand(0)) == genesis
+        assert list(mapped.expand(Production(5))) == list(grammar.expand(5))
+
+
+def test_load_file_object(genesis, tmp_path):
+    grammar = parse(genesis)
+    path = tmp_path / 'genesis.sksq'
+    path.write_bytes(dumps(grammar))
+    with open(path, 'rb') as reader:
+        with load(reader) as mapped:
+            assert mapped[Production(1)] == grammar[Production(1)]
+
+
+def test_load_bytes_io(genesis):
+    grammar = parse(genesis)
+    with load(io.BytesIO(dumps(grammar))) as mapped:
+        assert dict(mapped) == dict(grammar)
+
+
+def test_close_with_live_slice(genesis, tmp_path):
+    path = tmp_path / 'genesis.sksq'
+    path.write_bytes(dumps(parse(genesis)))
+    mapped = load(path)
+    piece = mapped._data[0:8]
+    mapped.close()
+    assert len(piece) == 8
+
+
+def test_terminals():
+    mark = Mark(kind='start')
+    iterable = [1, 2.5, b'x', mark, -300, 'y', 1, 2.5, b'x', 2**70]
+    grammar = parse(iterable)
+    mapped = MappedGrammar(dumps(grammar))
+    assert list(mapped.expand(0))[:3] == [1, 2.5, b'x']
+    assert repr(mapped[Production(0)][1]) == "Mark(kind='start')"
+    assert list(mapped.expand(0))[4:] == iterable[4:]
+    assert mapped[Production(1)] is not mapped[Production(1)]
+    mapped.close()
+
+
+def test_mapping():
+    mapped = MappedGrammar(dumps(parse('abab')))
+    assert list(mapped) == [Production(0), Production(1)]
+    assert 1 in mapped
+    assert 2 not in mapped
+    assert 'a' not in mapped
+    with pytest.raises(KeyError):
+        mapped[Production(2)]  # pylint: disable=pointless-statement
+
+
+def test_view_deleted_rule():
+    parser = Parser()
+    parser.feed('abcab')
+    parser.view()
+    parser.feed('c')
+    view = parser.view()
+    assert sorted(view) == [Production(0), Production(2)]
+    with MappedGrammar(dumps(view)) as mapped:
+        assert dict(mapped) == {
+            Production(0): [Production(1), Production(1)],
+            Production(1): list('abc'),
+        }
+        assert ''.join(mapped.expand(0)) == 'abcabc'
+
+
+def test_errors():
+    data = dumps(parse('abab'))
+    with pytest.raises(ValueError, match='truncated grammar header'):
+        MappedGrammar(data[:10])
+    with pytest.raises(ValueError, match='not a sksequitur grammar'):
+        MappedGrammar(b'XXXX' + data[4:])
+    header = binary.HEADER.pack(binary.MAGIC, 99, 0, 0, 0, 0, 0)
+    size = len(header)
+    with pytest.raises(ValueError, match='unsupported grammar version 99'):
+        MappedGrammar(header + data[size:])
+    with pytest.raises(ValueError, match='truncated grammar data'):
+        MappedGrammar(data[:-8])
+    *_, productions, symbols, terminals, blob = binary.HEADER.unpack_from(data)
+    end = size + 8 * (productions + symbols + terminals + 2) + blob
+    for stop in range(size + 1, end, 4):
+        with pytest.raises(ValueError, match='truncated grammar data'):
+            MappedGrammar(data[:stop])
+    with pytest.raises(ValueError, match='unknown terminal tag'):
+        binary.decode_terminal(b'?')
+
+
+def test_parser_errors():
+    parser = Parser()
+    parser.feed('abab')
+    buffer = io.BytesIO()
+    parser.dump(buffer)
+    data = buffer.getvalue()
+    with pytest.raises(ValueError, match='truncated parser state header'):
+        Parser.load(io.BytesIO(data[:10]))
+    with pytest.raises(ValueError, match='not a sksequitur parser state'):
+        Parser.load(io.BytesIO(b'XXXX' + data[4:]))
+    header = binary.PARSER_HEADER.pack(binary.PARSER_MAGIC, 99, *[0] * 7)
+    size = len(header)
+    with pytest.raises(ValueError, match='unsupported parser state version'):
+        Parser.load(io.BytesIO(header + data[size:]))
+    for stop in range(size, len(data) - 7, 8):
+        with pytest.raises(ValueError, match='truncated parser state data'):
+            Parser.load(io.BytesIO(data[:stop]))
@@ -0,0 +1,90 @@
+import random
+
+import pytest
+
+from sksequitur import Parser, Production, parse
+from sksequitur.cache import ExpansionCache
+
+
+def test_cache():
+    grammar = parse('abcabcxabcabc')
+    cache = grammar.cache()
+    assert isinstance(cache, ExpansionCache)
+    assert not cache
+    assert list(grammar.expand(1)) == list('abcabc')
+    assert cache.misses == 2
+    assert Production(2) in cache
+    assert cache.get(1) == tuple('abcabc')
+    assert cache.hits == 1
+    assert len(cache) == 2
+    assert cache.nbytes > 0
+    cache.clear()
+    assert not cache
+    assert cache.nbytes == 0
+
+
+@pytest.mark.parametrize('budget', [0, 120, 1 << 20])
+def test_slices(budget):
+    rand = random.Random(budget)
+    lines = [''.join(rand.choices('abc', k=12)) for _ in range(20)]
+    data = list('\n'.join(rand.choices(lines, k=200)))
+    grammar = parse(data)
+    cache = grammar.cache(budget)
+    for _ in range(200):
+        start = rand.randrange(-10, len(data) + 10)
+        stop = start + rand.randrange(-5, 100)
+        assert grammar[start:stop] == data[start:stop]
+        low, high = max(start, 0), max(stop, 0)
+        assert grammar.slice(start, stop) == data[low:high]
+    assert grammar[:] == data
+    assert cache.nbytes <= budget
+    assert (cache.hits + cache.misses > 0) == (budget > 0)
+
+
+def test_deep():
+    grammar = parse('a' * 2**16)
+    cache = grammar.cache()
+    assert len(cache.get(0)) == 2**16
+    assert grammar[1000:1005] == ['a'] * 5
+
+
+def test_start_not_kept():
+    grammar = parse('abcabcxabcabc')
+    cache = grammar.cache()
+    assert ''.join(grammar.expand(0)) == 'abcabcxabcabc'
+    assert Production(0) not in cache
+    assert Production(1) in cache
+    assert grammar[:] == list('abcabcxabcabc')
+    assert cache.get(0) == tuple('abcabcxabcabc')
+    assert Production(0) not in cache
+
+
+def test_large_not_built():
+    # Lengths are 256 for the start rule and 128, 64, 32, 16, 8 and 4.
+    grammar = parse('abcd' * 64)
+    cache = grammar.cache(400)
+    assert ''.join(grammar.expand(0)) == 'abcd' * 64
+    assert cache.misses == 4
+    assert len(cache) == 1
+    assert Production(3) in cache
+    assert grammar[:] == list('abcd' * 64)
+    assert grammar.slice(100, 120) == list('abcd' * 5)
+    assert cache.misses == 4
+
+
+def test_view_update():
+    parser = Parser()
+    parser.feed('abcabc')
+    view = parser.view()
+    cache = view.cache()
+    assert ''.join(view.expand(0)) == 'abcabc'
+    assert cache
+    parser.feed('abc')
+    parser.view()
+    assert not cache
+    assert ''.join(view.expand(0)) == 'abcabcabc'
+
+
+def test_budget():
+    with pytest.raises(ValueError, match='budget must be non-negative'):
+        parse('ab').cache(-1)
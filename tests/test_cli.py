@@ -0,0 +1,123 @@
+import io
+import pathlib
+import runpy
+import sys
+
+import pytest
+
+from sksequitur import cli, parse
+from sksequitur.binary import load
+
+module_dir = pathlib.Path(__file__).parent
+genesis = module_dir / 'genesis_input.txt'
+iamsam = module_dir / 'iamsam_input.txt'
+
+
+def stdin(monkeypatch, text):
+    buffer = io.BytesIO(text.encode('utf-8'))
+    monkeypatch.setattr(sys, 'stdin', io.TextIOWrapper(buffer))
+
+
+def test_text(capsysbinary):
+    cli.main([str(genesis), '--buffer-size', '100'])
+    output = capsysbinary.readouterr().out.decode('utf-8')
+    result = (module_dir / 'genesis_result.txt').read_text(encoding='utf-8')
+    assert output.rstrip('\n') == result.rstrip('\n')
+
+
+def test_words(capsysbinary, monkeypatch):
+    stdin(monkeypatch, 'ab cd ab cd\n ef gh ef  gh ')
+    cli.main(['--tokens', 'words', '--buffer-size', '3'])
+    output = capsysbinary.readouterr().out.decode('utf-8')
+    grammar = parse('ab cd ab cd ef gh ef gh'.split())
+    assert output == f'{grammar}\n'
+    stdin(monkeypatch, 'ab cd')
+    cli.main(['--tokens', 'words'])
+    assert capsysbinary.readouterr().out == b'0 -> ab cd\n'
+
+
+def test_lines(capsysbinary, monkeypatch):
+    stdin(monkeypatch, 'x\ny\nx\ny\n')
+    cli.main(['-t', 'lines', '-f', 'stats', '-'])
+    output = capsysbinary.readouterr().out.decode('utf-8')
+    assert 'productions: 2\n' in output
+    assert 'expanded length: 4\n' in output
+    stdin(monkeypatch, 'x\n')
+    cli.main(['-t', 'lines', '-f', 'stats'])
+    output = capsysbinary.readouterr().out.decode('utf-8')
+    assert 'max count: 0\n' in output
+
+
+@pytest.mark.parametrize('workers', ['1', '2'])
+def test_many(capsysbinary, tmp_path, workers):
+    paths = [str(genesis), str(iamsam)]
+    cli.main(['-f', 'stats', '-j', workers] + paths)
+    output = capsysbinary.readouterr().out.decode('utf-8')
+    assert output.startswith(f'==> {genesis} <==\nproductions: 227\n')
+    assert f'==> {iamsam} <==\nproductions: 234\n' in output
+    cli.main(['-f', 'binary', '-j', workers, '-o', str(tmp_path)] + paths)
+    with load(tmp_path / 'genesis_input.txt.sksq') as mapped:
+        assert len(mapped) == 227
+
+
+def test_stdin_output(tmp_path, monkeypatch):
+    stdin(monkeypatch, 'abab')
+    cli.main(['-o', str(tmp_path)])
+    assert (tmp_path / 'stdin.txt').read_text() == str(parse('abab')) + '\n'
+
+
+def test_directories(capsysbinary, tmp_path):
+    logs = tmp_path / 'logs'
+    (logs / 'web').mkdir(parents=True)
+    (logs / 'db').mkdir()
+    (logs / 'web' / 'app.log').write_text('abab')
+    (logs / 'db' / 'app.log').write_text('xyxy')
+    output = tmp_path / 'out'
+    cli.main(['-o', str(output), str(logs)])
+    text = (output / 'web' / 'app.log.txt').read_text()
+    assert text == str(parse('abab')) + '\n'
+    text = (output / 'db' / 'app.log.txt').read_text()
+    assert text == str(parse('xyxy')) + '\n'
+    cli.main(['-f', 'stats', str(logs)])
+    output = capsysbinary.readouterr().out.decode('utf-8')
+    assert output.startswith(f"==> {logs / 'db' / 'app.log'} <==\n")
+
+
+def test_duplicate_names(capsys, tmp_path):
+    first = tmp_path / 'first' / 'app.log'
+    second = tmp_path / 'second' / 'app.log'
+    for path in (first, second):
+        path.parent.mkdir()
+        path.write_text('abab')
+    with pytest.raises(SystemExit):
+        cli.main(['-o', str(tmp_path / 'out'), str(first), str(second)])
+    assert "written to 'app.log'" in capsys.readouterr().err
+
+
+def test_unreadable(capsysbinary, tmp_path):
+    path = tmp_path / 'latin.txt'
+    path.write_bytes(b'caf\xe9 caf\xe9')
+    missing = tmp_path / 'missing.txt'
+    with pytest.raises(SystemExit) as info:
+        cli.main(['-t', 'words', '-j', '1', str(path), str(missing)])
+    assert info.value.code == 1
+    captured = capsysbinary.readouterr()
+    grammar = parse(['caf\ufffd', 'caf\ufffd'])
+    assert f'{grammar}\n'.encode('utf-8') in captured.out
+    assert f'{missing}: No such file'.encode('utf-8') in captured.err
+
+
+def test_errors(capsys):
+    with pytest.raises(SystemExit):
+        cli.main(['-f', 'binary', str(genesis), str(iamsam)])
+    assert 'requires --output' in capsys.readouterr().err
+    with pytest.raises(SystemExit):
+        cli.main(['-', str(genesis)])
+    assert 'stdin can not be combined' in capsys.readouterr().err
+
+
+def test_module(capsysbinary, monkeypatch):
+    argv = ['sksequitur', '-f', 'stats', str(iamsam)]
+    monkeypatch.setattr(sys, 'argv', argv)
+    runpy.run_module('sksequitur', run_name='__main__')
+    assert b'productions: 234' in capsysbinary.readouterr().out
@@ -0,0 +1,72 @@
+import io
+import pathlib
+import random
+
+import pytest
+
+from sksequitur import ArrayParser, Mark, codec, parse
+from sksequitur.codec import MAGIC, compress, decompress, dump, dumps
+
+module_dir = pathlib.Path(__file__).parent
+
+
+@pytest.fixture(name='genesis')
+def fixture_genesis():
+    path = module_dir / 'genesis_input.txt'
+    return path.read_text(encoding='utf-8')
+
+
+def roundtrip(iterable, **kwargs):
+    buffer = io.BytesIO()
+    compress(iterable, buffer, **kwargs)
+    buffer.seek(0)
+    return list(decompress(buffer))
+
+
+def test_genesis(genesis):
+    data = dumps(parse(genesis))
+    assert len(data) < len(genesis.encode('utf-8')) // 2
+    assert ''.join(decompress(io.BytesIO(data))) == genesis
+
+
+def test_dump(genesis, tmp_path):
+    path = tmp_path / 'genesis.sksc'
+    with open(path, 'wb') as writer:
+        dump(parse(genesis), writer)
+    with open(path, 'rb') as reader:
+        assert ''.join(decompress(reader)) == genesis
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_random(seed):
+    rand = random.Random(seed)
+    alphabet = [1, 2, 'x', b'y', 3.5, 2**70, -5, 0, (1, 2)]
+    iterable = rand.choices(alphabet, k=rand.randrange(0, 400))
+    assert roundtrip(iterable) == iterable
+
+
+def test_large_alphabet():
+    rand = random.Random(0)
+    iterable = [rand.randrange(100_000) for _ in range(3_000)] * 2
+    assert roundtrip(iterable, parser=ArrayParser) == iterable
+
+
+def test_small_buffer(genesis, monkeypatch):
+    monkeypatch.setattr(codec, '_BUFFER_SIZE', 16)
+    assert ''.join(roundtrip(genesis)) == genesis
+    assert roundtrip([]) == []
+
+
+def test_marks():
+    values = roundtrip(['a', 'b', Mark(kind='eof'), 'a', 'b'])
+    assert repr(values) == "['a', 'b', Mark(kind='eof'), 'a', 'b']"
+
+
+def test_errors():
+    with pytest.raises(ValueError, match='not a sksequitur compressed'):
+        list(decompress(io.BytesIO(b'SKSQ\x01')))
+    with pytest.raises(ValueError, match='unsupported compressed stream'):
+        list(decompress(io.BytesIO(MAGIC + b'\x02')))
+    data = dumps(parse('abcabdabcabd'))
+    with pytest.raises(ValueError, match='truncated compressed stream'):
+        list(decompress(io.BytesIO(data[:-1])))
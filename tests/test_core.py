@@ -1,9 +1,14 @@
 import gc
+import io
 import pathlib
 import random
 import string
+import threading
 
-from sksequitur import Grammar, Mark, Parser, parse
+import pytest
+
+from sksequitur import Grammar, GrammarView, Mark, Parser, Production, parse
+from sksequitur.core import Rule, Stats, SymbolTable
 
 module_dir = pathlib.Path(__file__).parent
 
@@ -167,6 +172,497 @@ def test_benchmark_parsing(benchmark):
     benchmark(benchmark_parsing, iterable)
 
 
+def nested_tree(depth):
+    bigrams = {}
+    rules = [Rule() for _ in range(depth)]
+    for index, rule in enumerate(rules[:-1]):
+        rule.prev_symbol.append(index, bigrams)
+        rule.prev_symbol.append(rules[index + 1], bigrams)
+    rules[-1].prev_symbol.append(depth - 1, bigrams)
+    return rules[0]
+
+
+def test_stats():
+    parser = Parser()
+    parser.feed('abcabd')
+    parser.stats = Stats(interval=4)
+    parser.feed('abcabd')
+    stats = parser.stats
+    assert (stats.tokens, stats.creations, stats.reuses) == (6, 3, 2)
+    assert (stats.expansions, stats.rules) == (2, 1)
+    assert stats.samples == [(4, 6, 1)]
+    assert stats.peak_bigrams == 6
+    assert repr(stats).startswith('Stats(tokens=6, checks=')
+    parser = Parser()
+    parser.stats = Stats()
+    parser.feed('abbbabcbb')
+    assert parser.stats.overlaps == 2
+
+
+def test_tracking_threads():
+    rand = random.Random(0)
+    data = rand.choices('abcd', k=30_000)
+    other = rand.choices('wxyz', k=30_000)
+    expected = Parser()
+    expected.stats = Stats()
+    expected.feed(data)
+    parser = Parser()
+    parser.stats = Stats()
+    view = parser.view()
+    barrier = threading.Barrier(2)
+
+    def feed(target, values):
+        barrier.wait()
+        for start in range(0, len(values), 1000):
+            stop = start + 1000
+            target.feed(values[start:stop])
+
+    threads = [
+        threading.Thread(target=feed, args=(parser, data)),
+        threading.Thread(target=feed, args=(Parser(), other)),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert repr(parser.stats) == repr(expected.stats)
+    assert parser.view() is view
+    assert dict(view) == dict(Grammar(parser.tree))
+
+
+def test_stats_disabled():
+    parser = Parser()
+    parser.stats = Stats()
+
+    def values():
+        yield 'a'
+        raise ValueError
+
+    with pytest.raises(ValueError):
+        parser.feed(values())
+    other = Parser()
+    other.feed('abab')
+    assert parser.stats.tokens == 1
+    assert parser.stats.checks == 0
+
+
+def test_view_first():
+    parser = Parser()
+    parser.feed('abcabdabcabd')
+    view = parser.view()
+    assert isinstance(view, GrammarView)
+    assert dict(view) == dict(Grammar(parser.tree))
+    assert parser.view() is view
+
+
+def test_view(monkeypatch):
+    monkeypatch.setattr(GrammarView, 'chunk_size', 4)
+    rand = random.Random(0)
+    for trial in range(100):
+        parser = Parser()
+        if trial % 3 == 0:
+            parser.stats = Stats()
+        parser.feed(rand.choices('abc', k=rand.randrange(20)))
+        view = parser.view()
+        for _ in range(5):
+            alphabet = 'ab' if trial % 2 else 'abcd'
+            parser.feed(rand.choices(alphabet, k=rand.randrange(60)))
+            assert parser.view() is view
+            grammar = Grammar(parser.tree)
+            assert len(view) == len(grammar)
+            assert sorted(map(tuple, view.expansions().values())) == sorted(
+                map(tuple, grammar.expansions().values())
+            )
+            assert view.lengths() == Grammar.lengths(view)
+            assert view.counts() == Grammar.counts(view)
+            assert view[:] == grammar[:]
+
+
+def test_rule_count():
+    parser = Parser()
+    parser.feed('abcabcabc')
+    tree = parser.tree
+    assert not hasattr(tree, '__dict__')
+    assert not hasattr(tree.next_symbol, '__dict__')
+    assert tree.value is None
+    assert tree.count == 0
+    rules = {}
+    symbol = tree.next_symbol
+    while symbol is not tree:
+        rules[symbol.value] = rules.get(symbol.value, 0) + 1
+        symbol = symbol.next_symbol
+    (rule,) = rules
+    assert rule.value is None
+    assert rule.count == rules[rule] == 3
+
+
+def test_dump_load(tmp_path):
+    path = module_dir / 'genesis_input.txt'
+    text = path.read_text(encoding='utf-8')
+    half = len(text) // 2
+    parser = Parser()
+    parser.feed(text[:half])
+    with open(tmp_path / 'parser.sksp', 'wb') as writer:
+        parser.dump(writer)
+    with open(tmp_path / 'parser.sksp', 'rb') as reader:
+        resumed = Parser.load(reader)
+    assert Grammar(resumed.tree) == Grammar(parser.tree)
+    assert len(resumed.bigrams) == len(parser.bigrams)
+    parser.feed(text[half:])
+    resumed.feed(text[half:])
+    assert Grammar(resumed.tree) == Grammar(parser.tree)
+    assert len(resumed.bigrams) == len(parser.bigrams)
+
+
+def test_dump_load_documents():
+    table = SymbolTable(key=str)
+    parser = Parser(symbols=table)
+    parser.feed([1, 2.5, b'x', 'y', 1, 2.5, b'x', 'y'])
+    parser.add_document(['1', 2.5, 1, 2.5])
+    buffer = io.BytesIO()
+    parser.dump(buffer)
+    buffer.seek(0)
+    resumed = Parser.load(buffer, key=str)
+    assert resumed.symbols.values == table.values
+    assert resumed.symbols.ids == table.ids
+    assert len(resumed.documents) == 2
+    parser.feed([b'x', 'y'])
+    resumed.feed([b'x', 'y'])
+    grammar = Grammar(parser.documents, table)
+    assert Grammar(resumed.documents, resumed.symbols) == grammar
+    expansion = [1, 2.5, 1, 2.5, b'x', 'y']
+    assert list(grammar.expand(grammar.documents[1])) == expansion
+    empty = io.BytesIO()
+    Parser().dump(empty)
+    empty.seek(0)
+    assert not Parser.load(empty).documents[0].count
+
+
+def test_symbol_table():
+    table = SymbolTable()
+    parser = Parser(symbols=table)
+    assert parser.symbols is table
+    parser.feed([1, 1.0, True, 'a', 1, 1.0, True, 'a'])
+    assert len(table) == 4
+    assert table[1] == 1.0 and type(table[1]) is float
+    grammar = Grammar(parser.tree, table)
+    assert grammar[:] == [1, 1.0, True, 'a'] * 2
+    assert [type(value) for value in grammar[:4]] == [int, float, bool, str]
+    assert Grammar(parser.tree)[:] == [0, 1, 2, 3] * 2
+    view = parser.view()
+    parser.feed([1, 'b'])
+    assert parser.view()[:] == [1, 1.0, True, 'a'] * 2 + [1, 'b']
+    other = Parser(symbols=table)
+    other.feed('ab')
+    assert Grammar(other.tree)[:] == [3, 4]
+    assert view.count(['a', 1]) == 2
+
+
+def test_symbol_table_key():
+    table = SymbolTable(key=len)
+    parser = Parser(symbols=table)
+    parser.feed(['ab', 'cd', 'efg', 'hi', 'jk', 'lmn'])
+    assert Grammar(parser.tree, table)[:] == ['ab', 'ab', 'efg'] * 2
+
+
+def test_documents():
+    parser = Parser()
+    parser.feed('xy')
+    texts = ['ab', 'abab', 'ab', 'cab', '']
+    assert [parser.add_document(text) for text in texts] == [1, 2, 3, 4, 5]
+    assert parser.documents[0] is parser.tree
+    grammar = Grammar(parser.documents)
+    assert len(grammar.documents) == 6
+    assert grammar[Production(0)] == grammar.documents
+    expansions = [''.join(grammar.expand(each)) for each in grammar.documents]
+    assert expansions == ['xy'] + texts
+    assert grammar[grammar.documents[1]] == grammar[grammar.documents[3]]
+    assert grammar.lengths()[0] == 13
+    assert Grammar(parser.tree).documents == [0]
+    assert str(Grammar(parser.tree)) == '0 -> x y'
+
+
+def test_documents_invariants():
+    rand = random.Random(0)
+    for _ in range(200):
+        parser = Parser()
+        texts = [
+            rand.choices('abc', k=rand.randrange(30))
+            for _ in range(rand.randrange(1, 8))
+        ]
+        parser.feed(texts[0])
+        for text in texts[1:]:
+            parser.add_document(text[:3])
+            parser.feed(text[3:])
+        grammar = Grammar(parser.documents)
+        expansions = [list(grammar.expand(each)) for each in grammar.documents]
+        assert expansions == texts
+        counts = grammar.counts()
+        digrams = []
+        for production, body in grammar.items():
+            if production in grammar.documents or production == 0:
+                continue
+            assert counts[production] >= 2
+        for production, body in grammar.items():
+            if production == 0:
+                continue
+            for index in range(1, len(body)):
+                first, second = body[index - 1], body[index]
+                if index > 1 and body[index - 2] == first == second:
+                    continue  # Overlapping, like a a a.
+                digrams.append((repr(first), repr(second)))
+        assert len(digrams) == len(set(digrams))
+
+
+def test_documents_view():
+    parser = Parser()
+    parser.feed('abcd')
+    view = parser.view()
+    parser.add_document('abcdabcd')
+    parser.feed('xabcx')
+    assert parser.view()[:] == list('abcd')
+    assert dict(view) == dict(Grammar(parser.tree))
+
+
+def test_indexing():
+    path = module_dir / 'genesis_input.txt'
+    iterable = path.read_text(encoding='utf-8')
+    grammar = parse(iterable)
+    size = len(iterable)
+    rand = random.Random(0)
+    for _ in range(200):
+        index = rand.randrange(-size, size)
+        assert grammar[index] == iterable[index]
+    for _ in range(200):
+        start = rand.randrange(-size - 10, size + 10)
+        stop = rand.randrange(-size - 10, size + 10)
+        step = rand.choice([None, 1, 2, -1, -3])
+        key = slice(start, stop, step)
+        assert ''.join(grammar[key]) == iterable[key]
+        lower = max(start, 0)
+        upper = max(stop, 0)
+        assert ''.join(grammar.slice(start, stop)) == iterable[lower:upper]
+    assert grammar[:] == list(iterable)
+    assert list(grammar._iterate(size - 3)) == list(iterable[-3:])
+    with pytest.raises(IndexError):
+        grammar[size]  # pylint: disable=pointless-statement
+    with pytest.raises(IndexError):
+        grammar[-size - 1]  # pylint: disable=pointless-statement
+    with pytest.raises(KeyError):
+        grammar['x']  # pylint: disable=pointless-statement
+    assert 'x' not in grammar
+    assert grammar.get('x') is None
+    assert grammar.get(1) == grammar[1] == iterable[1]
+    assert grammar.get(size, 'missing') == 'missing'
+    assert grammar.get(Production(0)) == grammar[Production(0)]
+
+
+def test_expansion_limit():
+    grammar = parse('abcdefghij' * 2)
+    grammar.expansion_limit = 4
+    result = """\
+0 -> 1 1
+1 -> a b c d e f g h i j                          abcd…\
+"""
+    assert str(grammar) == result
+
+
+def naive_finditer(sequence, pattern):
+    size = len(pattern)
+    last = len(sequence) - size + 1
+    return [
+        index for index in range(last) if sequence[index:][:size] == pattern
+    ]
+
+
+def test_search():
+    rand = random.Random(0)
+    for trial in range(300):
+        alphabet = 'ab' if trial % 2 else 'abc'
+        sequence = ''.join(rand.choices(alphabet, k=rand.randrange(1, 200)))
+        grammar = parse(sequence)
+        size = rand.randrange(1, 12)
+        if rand.random() < 0.5 and len(sequence) > size:
+            start = rand.randrange(len(sequence) - size)
+            pattern = sequence[start:][:size]
+        else:
+            pattern = ''.join(rand.choices('abc', k=size))
+        expected = naive_finditer(sequence, pattern)
+        assert list(grammar.finditer(pattern)) == expected
+        assert grammar.count(pattern) == len(expected)
+        assert grammar.find(pattern) == (expected[0] if expected else -1)
+
+
+def test_search_genesis():
+    path = module_dir / 'genesis_input.txt'
+    iterable = path.read_text(encoding='utf-8')
+    grammar = parse(iterable)
+    for pattern in ['the', 'And God said', ' ', 'xyzzy']:
+        expected = naive_finditer(iterable, pattern)
+        assert list(grammar.finditer(pattern)) == expected
+    assert grammar.find('abcdefghij' * 1000) == -1
+    with pytest.raises(ValueError):
+        grammar.count('')
+
+
+def test_deep_grammar():
+    depth = 2_000
+    grammar = Grammar(nested_tree(depth))
+    assert grammar.depths()[depth - 1] == depth - 1
+    assert grammar[depth - 1] == depth - 1
+    assert grammar[-3:] == [depth - 3, depth - 2, depth - 1]
+    assert grammar.lengths()[0] == depth
+    assert grammar.expansions()[depth - 3] == [depth - 3, depth - 2, depth - 1]
+    assert list(grammar.expand(0)) == list(range(depth))
+    assert list(grammar.finditer([depth - 2, depth - 1])) == [depth - 2]
+
+
+def recursive_depths(grammar):
+    # Baseline: the recursive implementation replaced by Grammar.depths.
+    depths = {}
+
+    def _visit(production, depth):
+        depths[production] = min(depth, depths.get(production, depth))
+        for value in grammar[production]:
+            if type(value) is Production:
+                _visit(value, depth + 1)
+
+    _visit(Production(0), 0)
+    return depths
+
+
+def test_recursive_baseline():
+    parser = Parser()
+    parser.feed('a' * 2**10)
+    grammar = Grammar(parser.tree)
+    assert recursive_depths(grammar) == grammar.depths()
+    with pytest.raises(RecursionError):
+        recursive_depths(Grammar(nested_tree(5_000)))
+    assert Grammar(nested_tree(5_000)).depths()[4_999] == 4_999
+
+
+def test_statistics():
+    grammar = parse('abcabcxabcabc')
+    statistics = grammar.statistics()
+    assert len(statistics) == len(grammar)
+    assert list(statistics.productions) == [0, 1, 2]
+    assert list(statistics.counts) == [1, 2, 4]
+    assert list(statistics.lengths) == [13, 6, 3]
+    assert list(statistics.savings) == [0, 6, 9]
+    assert list(statistics.depths) == [0, 1, 2]
+    assert statistics.top(2) == [Production(2), Production(1)]
+    assert statistics.top(1, 'lengths') == [Production(0)]
+    assert statistics.counts.itemsize == 8
+
+
+def test_statistics_genesis():
+    path = module_dir / 'genesis_input.txt'
+    grammar = parse(path.read_text(encoding='utf-8'))
+    statistics = grammar.statistics()
+    lengths = grammar.lengths()
+    depths = grammar.depths()
+    occurrences = {production: 0 for production in grammar}
+    stack = [Production(0)]
+    while stack:
+        production = stack.pop()
+        occurrences[production] += 1
+        values = grammar[production]
+        stack.extend(value for value in values if type(value) is Production)
+    for row, production in enumerate(statistics.productions):
+        count = occurrences[production]
+        assert statistics.counts[row] == count
+        assert statistics.lengths[row] == lengths[production]
+        assert statistics.depths[row] == depths[production]
+        assert statistics.savings[row] == (count - 1) * lengths[production]
+    documents = Parser()
+    documents.feed('abab')
+    documents.add_document('abab')
+    statistics = Grammar(documents.documents).statistics()
+    assert list(statistics.counts) == [1, 1, 1, 2, 4]
+
+
+def test_compare():
+    today = parse('abcabc xyz abcabc hello hello')
+    yesterday = parse('abcabc uvw hello hello abcabc')
+    comparison = today.compare(yesterday)
+    assert comparison.shared == {Production(3): Production(3)}
+    assert list(comparison.regions()) == [
+        (0, 3, Production(3)),
+        (3, 6, Production(3)),
+        (6, 11, None),
+        (11, 14, Production(3)),
+        (14, 17, Production(3)),
+        (17, 29, None),
+    ]
+    assert comparison.similarity == yesterday.compare(today).similarity
+    assert today.compare(today).similarity == 1.0
+    assert list(today.compare(today).regions()) == [(0, 29, Production(0))]
+    assert parse('abab').compare(parse('xyxy')).similarity == 0.0
+    empty = parse('')
+    assert empty.compare(empty).similarity == 1.0
+    assert not list(empty.compare(empty).regions())
+
+
+def test_compare_genesis():
+    path = module_dir / 'genesis_input.txt'
+    text = path.read_text(encoding='utf-8')
+    middle = len(text) // 2
+    grammar = parse(text[:middle] + text)
+    other = parse(text + text[middle:])
+    comparison = grammar.compare(other)
+    assert 0.5 < comparison.similarity < 1.0
+    expansion = list(grammar.expand(0))
+    expansions = other.expansions()
+    position = 0
+    for start, stop, production in comparison.regions():
+        assert start == position < stop
+        if production is not None:
+            assert expansion[start:stop] == expansions[production]
+        position = stop
+    assert position == len(expansion)
+    hashes = grammar.hashes()
+    other_hashes = other.hashes()
+    for production, match in comparison.shared.items():
+        assert hashes[production] == other_hashes[match]
+
+
+def test_hashes_collisions():
+    grammar = parse([-1, 7, -1, 7, 3])
+    assert grammar.compare(parse([-2, 7, -2, 7, 3])).similarity == 0.0
+    assert grammar.compare(grammar).similarity == 1.0
+    big = [5 + (1 << 61) - 1] * 4
+    assert parse([5] * 4).hashes() != parse(big).hashes()
+    # Hashes of strings do not depend on PYTHONHASHSEED.
+    assert parse('abab').hashes() == {
+        Production(0): 521428766145085556,
+        Production(1): 1886953343153254107,
+    }
+
+
+@pytest.mark.parametrize('depths', [recursive_depths, Grammar.depths])
+def test_benchmark_depths(benchmark, depths):
+    # 'a' * 2**16 nests each rule twice so the recursive walk is exponential.
+    parser = Parser()
+    parser.feed('a' * 2**16)
+    grammar = Grammar(parser.tree)
+    benchmark(depths, grammar)
+
+
+def benchmark_analytics(grammar):
+    grammar.lengths()
+    grammar.depths()
+    grammar.expansions()
+    for _ in grammar.expand(0):
+        pass
+
+
+def test_benchmark_analytics(benchmark):
+    parser = Parser()
+    parser.feed('a' * 2**16)
+    grammar = Grammar(parser.tree)
+    benchmark(benchmark_analytics, grammar)
+
+
 def test_issue_7():
     # fmt: off
     grammar = parse([
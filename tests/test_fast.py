@@ -0,0 +1,86 @@
+import array
+import pathlib
+import random
+
+import pytest
+
+from sksequitur import Grammar, Mark, Parser, parse
+
+fast = pytest.importorskip('sksequitur._fast')
+
+module_dir = pathlib.Path(__file__).parent
+
+
+def grammars(iterable):
+    parser = Parser()
+    parser.feed(iterable)
+    fast_parser = fast.FastParser()
+    fast_parser.feed(iterable)
+    return Grammar(parser.tree), Grammar(fast_parser.tree)
+
+
+def test_fast_parser():
+    parser = fast.FastParser()
+    parser.feed('ab')
+    assert len(parser.bigrams) == 1
+    assert parser.terminals == ['a', 'b']
+    assert parser.nbytes > 0
+    grammar = Grammar(parser.tree)
+    assert str(grammar) == '0 -> a b'
+    assert list(grammar.expand(0)) == ['a', 'b']
+
+
+@pytest.mark.parametrize(
+    'iterable',
+    [
+        'hello hello\n',
+        'abcabdabcabd',
+        'abbbabcbb',
+        'a' * 1000,
+        [1, 2, 3, 4, 1, 2, 3, 5, 1, 2, 3],
+        [1, True, 1.0, 1, True, 1.0, 1, True],
+        ['a', 'b', Mark(), 'a', 'b', Mark(), 'a', 'b'],
+    ],
+)
+def test_same_grammar(iterable):
+    expected, actual = grammars(iterable)
+    assert actual == expected
+
+
+@pytest.mark.parametrize('name', ['genesis', 'iamsam'])
+def test_same_fixtures(name):
+    path = module_dir / f'{name}_input.txt'
+    iterable = path.read_text(encoding='utf-8')
+    expected, actual = grammars(iterable)
+    assert str(actual) == str(expected)
+    assert list(actual.expand(0)) == list(iterable)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_same_random(seed):
+    rand = random.Random(seed)
+    alphabet = 'abc'[: rand.randint(1, 3)]
+    data = rand.choices(alphabet, k=rand.randrange(2000))
+    expected, actual = grammars(data)
+    assert actual == expected
+
+
+@pytest.mark.parametrize('typecode', 'bBhHiIlLqQ')
+def test_feed_array(typecode):
+    values = [7, 3, 7, 3, 100, 7, 3, 100, 0, 1, 0, 1]
+    parser = fast.FastParser()
+    parser.feed_array(array.array(typecode, values))
+    assert Grammar(parser.tree) == parse(values)
+
+
+def test_feed_array_large():
+    values = [2**40, -5, 2**40, -5, 70_000, -5, 70_000, -5]
+    parser = fast.FastParser()
+    parser.feed_array(array.array('q', values))
+    parser.feed([2**40, -5])
+    assert Grammar(parser.tree) == parse(values + [2**40, -5])
+
+
+def test_parse_engine():
+    grammar = parse('abcabc', parser=fast.FastParser)
+    assert grammar == parse('abcabc')
@@ -0,0 +1,72 @@
+import array
+
+import numpy
+import pytest
+
+from sksequitur import ArrayParser, Grammar, Parser, StreamParser, parse
+from sksequitur.core import as_ints
+
+
+def tokens():
+    rand = numpy.random.default_rng(0)
+    return numpy.tile(rand.integers(0, 300, 100, dtype=numpy.int32), 10)
+
+
+@pytest.mark.parametrize('engine', [Parser, ArrayParser, StreamParser])
+def test_feed_array(engine):
+    values = tokens()
+    parser = engine()
+    parser.feed_array(values)
+    grammar = Grammar(parser.tree)
+    assert grammar == parse(values.tolist())
+    assert all(type(value) is int for value in grammar.expand(0))
+
+
+def test_as_ints():
+    values = numpy.arange(6, dtype=numpy.int64).reshape(2, 3)
+    assert as_ints(values).tolist() == list(range(6))
+    assert as_ints(array.array('b', [1, -1])).tolist() == [1, -1]
+    with pytest.raises(ValueError, match='not an integer'):
+        as_ints(numpy.zeros(3))
+    with pytest.raises(ValueError, match='not contiguous'):
+        as_ints(values[:, 1])
+    with pytest.raises(ValueError, match='not an integer'):
+        as_ints(values.astype('>i8'))
+
+
+def test_arrays():
+    grammar = parse([1, 2, 3, 1, 2, 3, 0])
+    offsets, bodies = grammar.arrays()
+    assert offsets.tolist() == [0, 3, 6]
+    assert bodies.tolist() == [-2, -2, 0, 1, 2, 3]
+    assert bodies.dtype == numpy.int64
+    with pytest.raises(ValueError, match='negative terminal'):
+        parse([-1, -1]).arrays()
+    with pytest.raises(TypeError):
+        parse('ab').arrays()
+
+
+def test_arrays_view():
+    parser = Parser()
+    parser.feed([1, 2, 3, 1, 2])
+    parser.view()
+    parser.feed([3])
+    view = parser.view()
+    assert sorted(view) == [0, 2]
+    offsets, bodies = view.arrays()
+    assert offsets.tolist() == [0, 2, 5]
+    assert bodies.tolist() == [-2, -2, 1, 2, 3]
+
+
+def test_expand_to_array():
+    values = tokens()
+    grammar = parse(values.tolist())
+    out = numpy.zeros(len(values) + 2, dtype=numpy.int32)
+    assert grammar.expand_to_array(out) == len(values)
+    assert out[:-2].tolist() == values.tolist()
+    assert out[-2:].tolist() == [0, 0]
+    out = array.array('q', bytes(8 * len(values)))
+    size = grammar.expand_to_array(out, 1)
+    assert out[:size].tolist() == list(grammar.expand(1))
+    with pytest.raises(ValueError, match='output buffer needs'):
+        grammar.expand_to_array(numpy.zeros(3, dtype=numpy.int32))
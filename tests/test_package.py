@@ -0,0 +1,58 @@
+import importlib.util
+import os
+import pathlib
+import subprocess
+import sys
+import time
+
+import pytest
+
+import sksequitur
+from sksequitur import core
+
+root_dir = pathlib.Path(__file__).parent.parent
+
+
+def run(code, **env):
+    environ = dict(os.environ, PYTHONPATH=str(root_dir), **env)
+    args = [sys.executable, '-c', code]
+    return subprocess.run(args, capture_output=True, env=environ, text=True)
+
+
+def test_lazy_import():
+    code = 'import sys, sksequitur; print(*sorted(sys.modules))'
+    modules = run(code).stdout.split()
+    assert [name for name in modules if 'sksequitur' in name] == ['sksequitur']
+    code = 'import sys; from sksequitur import Parser; print(*sys.modules)'
+    modules = run(code).stdout.split()
+    assert 'sksequitur.core' in modules
+    assert 'sksequitur.api' not in modules
+
+
+def test_getattr():
+    assert sksequitur.Parser is core.Parser
+    assert sksequitur.StreamParser.__name__ == 'StreamParser'
+    assert set(sksequitur.__all__) <= set(dir(sksequitur))
+    with pytest.raises(AttributeError, match='no attribute'):
+        sksequitur.missing  # pylint: disable=pointless-statement
+
+
+def test_backend():
+    compiled = importlib.util.find_spec('sksequitur._core') is not None
+    assert sksequitur.backend == ('cython' if compiled else 'python')
+    process = run('import sksequitur.core', SKSEQUITUR_REQUIRE_CYTHON='1')
+    assert (process.returncode == 0) == compiled
+    process = run('import sksequitur.core', SKSEQUITUR_REQUIRE_CYTHON='0')
+    assert process.returncode == 0
+
+
+def test_cold_start():
+    def elapsed(code):
+        start = time.perf_counter()
+        assert run(code).returncode == 0
+        return time.perf_counter() - start
+
+    baseline = min(elapsed('pass') for _ in range(3))
+    code = 'import sksequitur; print(sksequitur.parse("abcabc"))'
+    cold = min(elapsed(code) for _ in range(3))
+    assert cold - baseline < 0.5
@@ -0,0 +1,93 @@
+import pathlib
+import random
+
+import pytest
+
+from sksequitur import ArrayParser, Mark, Production, parse, parse_many
+from sksequitur.parallel import merge, split
+
+module_dir = pathlib.Path(__file__).parent
+
+
+@pytest.fixture(name='genesis')
+def fixture_genesis():
+    path = module_dir / 'genesis_input.txt'
+    return path.read_text(encoding='utf-8')
+
+
+def check(grammar):
+    counts = grammar.counts()
+    assert all(counts[production] >= 2 for production in grammar if production)
+    seen = {}
+    for production, values in grammar.items():
+        pairs = zip(values, values[1:])
+        for index, pair in enumerate(pairs):
+            key = tuple((type(value) is Production, value) for value in pair)
+            if key in seen:
+                # Only overlapping digrams like "aaa" may repeat.
+                assert seen[key] == (production, index - 1)
+            seen[key] = production, index
+
+
+def test_genesis(genesis):
+    starts = range(0, len(genesis), 1000)
+    chunks = [genesis[start:][:1000] for start in starts]
+    grammar = parse_many(chunks, max_workers=2)
+    assert ''.join(grammar.expand(0)) == genesis
+    check(grammar)
+
+
+def test_single_chunk(genesis):
+    grammar = parse_many([genesis], parser=ArrayParser, max_workers=1)
+    assert grammar == parse(genesis)
+
+
+def test_unify():
+    grammar = merge([parse('abcabc'), parse('xabcabc')])
+    assert grammar == parse('abcabcxabcabc')
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_random(seed):
+    rand = random.Random(seed)
+    iterable = ''.join(rand.choices('abc', k=rand.randrange(1, 300)))
+    cuts = sorted(rand.sample(range(len(iterable) + 1), 3))
+    starts = [0] + cuts
+    stops = cuts + [len(iterable)]
+    chunks = [iterable[start:stop] for start, stop in zip(starts, stops)]
+    grammar = parse_many(chunks, max_workers=1)
+    assert ''.join(grammar.expand(0)) == iterable
+    check(grammar)
+
+
+def test_split():
+    mark = Mark()
+    iterable = ['a', mark, 'b', 'c', mark, 'd', 'e', 'f', mark, 'g']
+    assert list(split(iterable, 3)) == [
+        ['a', mark, 'b', 'c', mark],
+        ['d', 'e', 'f', mark],
+        ['g'],
+    ]
+    assert list(split([], 2)) == []
+    assert list(split(['a', mark], 2)) == [['a', mark]]
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_split_marks(seed):
+    rand = random.Random(seed)
+    marks = [Mark() for _ in range(5)]
+    iterable = rand.choices(['a', 'b', 'c', 'x', 'y', *marks], k=200)
+    grammar = parse_many(list(split(iterable, 4)), max_workers=1)
+    # Marks compare by identity and are rebuilt from the binary format.
+    assert list(map(str, grammar.expand(0))) == list(map(str, iterable))
+    check(grammar)
+
+
+def benchmark_parse_many(chunks, max_workers):
+    return parse_many(chunks, max_workers=max_workers)
+
+
+@pytest.mark.parametrize('max_workers', [1, 2, 4])
+def test_benchmark_parse_many(benchmark, genesis, max_workers):
+    chunks = [genesis * 4] * 8
+    benchmark(benchmark_parse_many, chunks, max_workers)
@@ -0,0 +1,72 @@
+import tracemalloc
+
+import pytest
+
+from sksequitur import ArrayParser, Grammar, Parser, Profile, Stats, parse
+
+
+def test_parse_profile():
+    grammar, profile = parse('abcabc' * 100, profile=True)
+    assert grammar == parse('abcabc' * 100)
+    assert [phase.name for phase in profile.phases] == ['feed', 'grammar']
+    feed = profile['feed']
+    assert feed.tokens == 600
+    assert feed.seconds > 0
+    assert feed.rate == 600 / feed.seconds
+    assert feed.peak >= feed.allocated > 0
+    assert 'feed' in str(profile)
+    assert repr(feed).startswith("Phase(name='feed', tokens=600")
+    assert not tracemalloc.is_tracing()
+    with pytest.raises(KeyError):
+        profile['render']
+
+
+def test_profile_phases():
+    tracemalloc.start()
+    try:
+        with Profile() as profile:
+            with profile.phase('feed', tokens=4) as phase:
+                parser = ArrayParser()
+                parser.feed('abab')
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+    assert phase.tokens == 4
+    profile = Profile()
+    with profile.phase('grammar') as phase:
+        Grammar(parser.tree)
+    assert phase.allocated == phase.peak == 0
+    assert phase.rate == 0.0
+    assert profile.phases == [phase]
+
+
+@pytest.mark.parametrize('owned', [True, False])
+def test_without_reset_peak(monkeypatch, owned):
+    monkeypatch.delattr(tracemalloc, 'reset_peak', raising=False)
+    if not owned:
+        tracemalloc.start()
+    try:
+        with Profile() as profile:
+            with profile.phase('first'):
+                data = [object() for _ in range(1000)]
+            del data
+            with profile.phase('feed') as phase:
+                parser = Parser()
+                parser.feed('abcabc' * 100)
+            assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+    assert phase.peak >= phase.allocated > 0
+
+
+def test_progress():
+    reports = []
+
+    def report(stats):
+        reports.append((stats.tokens, stats.rate > 0))
+
+    parser = Parser()
+    parser.stats = Stats(interval=100, callback=report)
+    parser.feed('abc' * 150)
+    assert reports == [(100, True), (200, True), (300, True), (400, True)]
+    assert len(parser.stats.samples) == 4
@@ -0,0 +1,55 @@
+import re
+
+import pytest
+
+from sksequitur import Parser, parse, parse_file, read_tokens
+
+
+@pytest.fixture
+def log(tmp_path):
+    path = tmp_path / 'service.log'
+    path.write_bytes(b'start\nok\nok\nstop\nok\nok\nstop')
+    return path
+
+
+def test_lines(log):
+    tokens = list(read_tokens(log, encoding='utf-8'))
+    assert tokens == ['start', 'ok', 'ok', 'stop', 'ok', 'ok', 'stop']
+    assert tokens[1] is tokens[4]
+    raw = list(read_tokens(log))
+    assert raw[0] == b'start'
+    assert raw[3] is raw[6]
+    assert parse_file(log) == parse(raw)
+
+
+def test_bytes(log):
+    data = log.read_bytes()
+    assert list(read_tokens(log, 'bytes')) == list(data)
+    assert parse_file(log, 'bytes') == parse(data)
+
+
+def test_pattern(log):
+    words = re.compile(rb'[a-z]+')
+    tokens = list(read_tokens(log, words, encoding='ascii'))
+    assert tokens == ['start', 'ok', 'ok', 'stop', 'ok', 'ok', 'stop']
+    assert tokens[2] is tokens[5]
+    grammar = parse_file(log, re.compile(rb'o'), parser=Parser)
+    assert list(grammar.expand(0)) == [b'o'] * 6
+
+
+def test_empty(tmp_path):
+    path = tmp_path / 'empty.log'
+    path.write_bytes(b'')
+    assert not list(read_tokens(path))
+    assert list(parse_file(path).expand(0)) == []
+
+
+def test_partial(log):
+    tokens = read_tokens(log)
+    assert next(tokens) == b'start'
+    tokens.close()
+
+
+def test_errors(log):
+    with pytest.raises(ValueError, match='unknown tokens'):
+        read_tokens(log, 'words')
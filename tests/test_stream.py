@@ -0,0 +1,133 @@
+import pathlib
+import random
+import string
+
+import pytest
+
+from sksequitur import ArrayParser, Grammar, Production, StreamParser
+
+module_dir = pathlib.Path(__file__).parent
+
+
+def expand(productions, values):
+    result = []
+    stack = list(reversed(values))
+    while stack:
+        value = stack.pop()
+        if type(value) is Production:
+            stack.extend(reversed(productions[value]))
+        else:
+            result.append(value)
+    return result
+
+
+def stream(iterable, window, size, seed=0):
+    rand = random.Random(seed)
+    parser = StreamParser(window)
+    productions = {}
+    frozen = []
+    for start in range(0, len(iterable), size):
+        stop = start + size
+        parser.feed(iterable[start:stop])
+        if rand.random() < 0.5:
+            checkpoint = parser.checkpoint()
+            productions.update(checkpoint)
+            frozen.extend(checkpoint.frozen)
+    checkpoint = parser.checkpoint()
+    productions.update(checkpoint)
+    frozen.extend(checkpoint.frozen)
+    return parser, productions, frozen
+
+
+def test_checkpoint():
+    parser = StreamParser()
+    parser.feed('abcab')
+    checkpoint = parser.checkpoint()
+    assert checkpoint == {
+        0: [Production(1), 'c', Production(1)],
+        1: ['a', 'b'],
+    }
+    assert checkpoint.deleted == set()
+    assert checkpoint.frozen == []
+    parser.feed('c')
+    checkpoint = parser.checkpoint()
+    assert checkpoint == {
+        0: [Production(2), Production(2)],
+        2: ['a', 'b', 'c'],
+    }
+    assert checkpoint.deleted == {1}
+    assert parser.checkpoint() == {}
+
+
+def test_only_changed_rules():
+    parser = StreamParser()
+    parser.feed('abcabc xyzxyz ')
+    assert list(parser.checkpoint()) == [0, 2, 4]
+    parser.feed('abc')
+    checkpoint = parser.checkpoint()
+    assert 4 not in checkpoint
+    assert checkpoint.deleted == set()
+
+
+def test_window():
+    parser = StreamParser(window=2)
+    parser.feed('abcdab')
+    checkpoint = parser.checkpoint()
+    assert checkpoint == {0: ['a', 'b']}
+    assert checkpoint.frozen == ['a', 'b', 'c', 'd']
+    assert len(parser) == 2
+
+
+@pytest.mark.parametrize('window', [None, 1, 2, 3, 10, 100])
+@pytest.mark.parametrize('seed', range(5))
+def test_roundtrip(window, seed):
+    rand = random.Random(seed)
+    iterable = ''.join(rand.choices('abc', k=rand.randrange(1, 500)))
+    parser, productions, frozen = stream(iterable, window, 7, seed)
+    assert ''.join(expand(productions, frozen + productions[0])) == iterable
+    assert len(parser) == len(productions[0])
+    if window is None:
+        assert not frozen
+    else:
+        assert len(parser) <= window
+
+
+def test_genesis():
+    path = module_dir / 'genesis_input.txt'
+    iterable = path.read_text(encoding='utf-8')
+    parser, productions, _ = stream(iterable, None, 100)
+    array_parser = ArrayParser()
+    array_parser.feed(iterable)
+    assert Grammar(parser.tree) == Grammar(array_parser.tree)
+    assert ''.join(expand(productions, productions[0])) == iterable
+
+
+def test_bounded():
+    rand = random.Random(0)
+    iterable = rand.choices(string.ascii_lowercase, k=20_000)
+    parser = StreamParser(window=100)
+    parser.feed(iterable[:10_000])
+    parser.checkpoint()
+    resident = parser._size - len(parser._free)
+    parser.feed(iterable[10_000:])
+    parser.checkpoint()
+    assert parser.window == 100
+    assert parser._size - len(parser._free) < 2 * resident
+    assert len(parser.bigrams) < resident
+
+
+def test_bounded_terminals():
+    parser = StreamParser(window=100)
+    parser.feed(range(50_000))
+    parser.feed([1, 2, 1, 2])
+    checkpoint = parser.checkpoint()
+    assert len(parser._ids) <= 101
+    assert sum(value is not None for value in parser.terminals) <= 101
+    assert checkpoint.frozen[:3] == [0, 1, 2]
+    assert checkpoint[0][-1] == Production(1)
+    assert len(parser.terminals) <= 201
+
+
+def test_window_error():
+    with pytest.raises(ValueError):
+        StreamParser(window=0)